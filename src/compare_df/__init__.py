@@ -1,3 +1,20 @@
-from compare_df.__main__ import main  # noqa: F401
-
 __version__ = "0.3.0"
+
+
+def __getattr__(name):
+    """Import the public objects lazily, so that the thin client (see
+    `compare_df.client`) can be used without importing Pandas.
+    """
+    if name == "main":
+        from compare_df.__main__ import main
+
+        return main
+    if name == "DiffResult":
+        from compare_df.diff_result import DiffResult
+
+        return DiffResult
+    if name == "compare_workbooks":
+        from compare_df.workbook import compare_workbooks
+
+        return compare_workbooks
+    raise AttributeError(f"module 'compare_df' has no attribute '{name}'")
@@ -30,7 +30,8 @@ from pathlib import Path
 
 import pandas as pd
 
-from compare_df import foos
+from compare_df import archive, foos, planner
+from compare_df.diff_result import DatetimeTolerance, DiffResult, Tolerance
 
 
 def main(
@@ -38,7 +39,16 @@ def main(
     df_2: Union[str, Path, pd.DataFrame],
     load_params_1: Optional[Dict[str, str]] = None,
     load_params_2: Optional[Dict[str, str]] = None,
-) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    unkeyed: bool = False,
+    return_result: bool = False,
+    interactive: bool = True,
+    sample_rate: Optional[float] = None,
+    abs_tol: Tolerance = None,
+    rel_tol: Tolerance = None,
+    datetime_tol: DatetimeTolerance = None,
+    strategy: str = "auto",
+    archive_path: Union[str, Path, None] = None,
+) -> Tuple[Union[pd.DataFrame, DiffResult], pd.DataFrame, pd.DataFrame]:
     """Run the full comparison process for two CSV files. Report
     progress and results, return 3 dataframes for further investigation.
     Additionally offer the option to save `df_diff` to excel.
@@ -54,29 +64,132 @@ def main(
             passed to `pd.read_csv` for DF_1. Defaults to None.
         load_params_2: Dict of key-value pairs in string format, to be
             passed to `pd.read_csv` for DF_2. Defaults to None.
+        unkeyed: If True, the index and the row order are ignored and
+            the DFs are compared as multisets of full rows. Use this for
+            data without a natural key. Defaults to False.
+        return_result: If True, a `DiffResult` object is returned in
+            place of `df_diff`. It holds `df_diff` together with the
+            cached counts of the differences per column and row.
+            Defaults to False.
+        interactive: If False, the user is never prompted and the
+            default answers are taken instead: Non-overlapping columns
+            are dropped and no output file is saved. Defaults to True.
+        sample_rate: If passed, only a deterministic sample of this
+            share of the index values (e.g. 0.01) is loaded and compared,
+            and the difference rates per column are estimated with
+            confidence intervals. Not available in `unkeyed` mode.
+            Defaults to None (exact comparison of all rows).
+        abs_tol: Absolute tolerance for numeric values, either for all
+            columns or as a dict with values for specific columns.
+            Defaults to None.
+        rel_tol: Relative tolerance for numeric values (relative to the
+            values of DF_2), same format as `abs_tol`. Defaults to None.
+        datetime_tol: Tolerance window for datetime values, e.g. "1s",
+            same format as `abs_tol`. Defaults to None.
+            (The tolerances are only applied to columns of numeric,
+            respectively datetime dtype in both DFs, and not in `unkeyed`
+            mode. Note that columns with missing values are of `object`
+            type after imputation.)
+        strategy: If "auto", the size of CSV files is estimated before
+            loading them and the execution plan is reported. If the
+            files are estimated not to fit into memory, the process
+            stops. Pass "sampled" to compare them on a sample in that
+            case (see `sample_rate`), or "in-memory" to always load the
+            full files without estimation. Defaults to "auto".
+        archive_path: If passed, the differing values are written to
+            this Parquet file, together with metadata about the inputs
+            and the run, for later lookup by key or column (see
+            `archive.query_archive`). Requires the `pyarrow` package.
+            Not available in `unkeyed` mode. Defaults to None.
 
     Returns:
         df_diff: Boolean dataframe indicating the exact positions of
             the differing values ("True"). If the DFs are totally equal
-            an empty dataframe ist returned.
+            an empty dataframe ist returned. In `unkeyed` mode, the
+            rows found in only one of the DFs are returned instead,
+            with their counts per DF (also if `return_result` is True).
         df_1: The final state of DF_1 after processing
         df_2: The final state of DF_2 after processing
     """
+    if sample_rate is not None and unkeyed:
+        raise ValueError("Sampling is not possible in unkeyed mode.")
+    if strategy not in ["auto", "in-memory", "sampled"]:
+        raise ValueError(
+            "Invalid strategy. Use 'auto', 'in-memory' or 'sampled'."
+        )
+    if archive_path is not None and unkeyed:
+        raise ValueError("Archiving is not possible in unkeyed mode.")
+
+    archive_metadata = {
+        "inputs": [
+            str(df) if isinstance(df, (str, Path)) else type(df).__name__
+            for df in [df_1, df_2]
+        ],
+        "load_params": [load_params_1, load_params_2],
+        "abs_tol": abs_tol,
+        "rel_tol": rel_tol,
+        "datetime_tol": datetime_tol,
+    }
+
     input_type = foos.check_input_type(df_1, df_2)
     if input_type == "filepath":
         file_format = foos.indentify_file_format(df_1, df_2)
+        # Only CSV files can be sampled while reading, see `planner`
+        if (
+            file_format == ".csv"
+            and strategy != "in-memory"
+            and sample_rate is None
+        ):
+            plan = planner.plan_comparison(
+                df_1, df_2, load_params_1, load_params_2, unkeyed
+            )
+            planner.print_plan(plan)
+            if plan.strategy == "sampled" and strategy == "auto":
+                raise SystemExit(
+                    "The files are estimated not to fit into memory. Pass "
+                    "the strategy 'sampled' to compare a sample of the "
+                    "rows, or 'in-memory' to load the full files anyway."
+                )
+            sample_rate = plan.sample_rate
         df_1, df_2 = foos.load_files(
-            df_1, df_2, file_format, load_params_1, load_params_2
+            df_1,
+            df_2,
+            file_format,
+            load_params_1,
+            load_params_2,
+            interactive,
+            sample_rate,
         )
+    elif sample_rate is not None:
+        df_1 = foos.sample_by_key(df_1, sample_rate)
+        df_2 = foos.sample_by_key(df_2, sample_rate)
+    foos.check_for_tolerances_on_missing_values(
+        df_1, df_2, abs_tol, rel_tol, datetime_tol
+    )
     df_1, df_2 = foos.impute_missing_values(df_1, df_2)
     df_diff = pd.DataFrame()
+    result = DiffResult(pd.DataFrame(), pd.DataFrame())
 
     if foos.check_if_dataframes_are_equal(df_1, df_2):
-        print("Successfully compared, DFs are identical.")
+        # No value is compared, the counts of this result are all zero
+        equal_result = DiffResult(
+            df_1, df_2, equal_columns=range(df_1.shape[1])
+        )
+        if sample_rate is not None:
+            print("Successfully compared, the sampled DFs are identical.")
+            foos.estimate_difference_rates(equal_result, sample_rate)
+        else:
+            print("Successfully compared, DFs are identical.")
+        if archive_path is not None:
+            archive.write_archive(
+                equal_result,
+                archive_path,
+                dict(archive_metadata, sample_rate=sample_rate),
+            )
     else:
         if foos.check_for_same_width(df_1, df_2):
             if not foos.check_for_identical_column_names(df_1, df_2):
-                user_input = foos.get_user_input("columns")
+                user_input = foos.get_user_input("columns", interactive)
                 if user_input == "y":
                     df_1, df_2 = foos.handle_different_values(
                         "columns", df_1, df_2
@@ -88,20 +201,54 @@ def main(
 
         df_1, df_2 = foos.sort_columns(df_1, df_2)
 
-        if not foos.check_for_identical_index_values(df_1, df_2):
+        if not unkeyed and not foos.check_for_identical_index_values(
+            df_1, df_2
+        ):
             df_1, df_2 = foos.handle_different_values("index", df_1, df_2)
 
-        if not foos.check_for_identical_dtypes(df_1, df_2):
-            df_1, df_2 = foos.enforce_dtype_identity(df_1, df_2)
+        identical_columns = []
+        if not unkeyed:
+            identical_columns = foos.find_identical_columns(df_1, df_2)
 
-        df_diff = foos.compare(df_1, df_2)
+        if not foos.check_for_identical_dtypes(df_1, df_2):
+            df_1, df_2 = foos.enforce_dtype_identity(
+                df_1, df_2, identical_columns
+            )
 
-        if df_diff.sum().sum() > 0:
-            user_input = foos.get_user_input("output")
+        if unkeyed:
+            df_diff = foos.compare_unkeyed(df_1, df_2)
+            n_differences = len(df_diff)
+        else:
+            result = foos.compare_to_result(
+                df_1,
+                df_2,
+                abs_tol,
+                rel_tol,
+                datetime_tol,
+                identical_columns,
+            )
+            n_differences = result.total
+            if sample_rate is not None:
+                foos.estimate_difference_rates(result, sample_rate)
+            if archive_path is not None:
+                archive.write_archive(
+                    result,
+                    archive_path,
+                    dict(archive_metadata, sample_rate=sample_rate),
+                )
+
+        if n_differences > 0:
+            user_input = foos.get_user_input("output", interactive)
             if user_input == "y":
-                foos.save_differences_to_xlsx(df_diff)
-
-    return df_diff, df_1, df_2
+                foos.save_differences_to_xlsx(
+                    df_diff if unkeyed else result.df_diff
+                )
+
+    if unkeyed:
+        return df_diff, df_1, df_2
+    if return_result:
+        return result, df_1, df_2
+    return result.df_diff, df_1, df_2
 
 
 if __name__ == "__main__":
@@ -0,0 +1,181 @@
+"""Compare Data From The Command Line
+This is the diff archive. The differing values of a comparison are
+gathered with the mask of the comparison (no second comparison pass)
+and written block by block to a Parquet file, in long format with the
+columns `key`, `column`, `value_df_1` and `value_df_2` (all as str).
+The rows are ordered by key, so that the min / max statistics of each
+row group serve as a key index: Looking up the differences for some
+keys or columns only reads the row groups that can contain them.
+The inputs, load params and run stats are stored as JSON in the file
+metadata.
+
+Usage:
+------
+    $ compare_df path_1 path_2 --archive diff.parquet
+    $ compare_df --query diff.parquet --keys 4711 --columns price
+
+    >>> from compare_df.archive import query_archive
+    >>> df = query_archive('diff.parquet', keys=['4711'])
+
+Writing and reading archives requires the optional `pyarrow` package.
+"""
+
+import datetime as dt
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from compare_df.diff_result import DiffResult
+
+ROW_GROUP_SIZE = 100_000  # Differing rows per block / row group
+METADATA_KEY = b"compare_df"
+COLUMNS = ["key", "column", "value_df_1", "value_df_2"]
+
+
+def _import_pyarrow():
+    """Return the `pyarrow` and `pyarrow.parquet` modules, raise an
+    ImportError with installation instructions if they are missing.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(
+            "Diff archives require the `pyarrow` package. "
+            "Install it with `pip install pyarrow`, please."
+        )
+    return pyarrow, pyarrow.parquet
+
+
+def write_archive(
+    result: DiffResult,
+    path: Union[str, Path],
+    metadata: Optional[Dict[str, Any]] = None,
+    row_group_size: int = ROW_GROUP_SIZE,
+) -> None:
+    """Write the differing values of the result to a Parquet file, one
+    row group per block of `row_group_size` differing rows, in the
+    order of the keys (index values as str). The mask and the counts of
+    the comparison are reused, no values are compared again. Only the
+    differing values of the current block are gathered. The passed
+    metadata (e.g. inputs and load params) is stored together with the
+    shape and the counts of the differences.
+    """
+    pa, pq = _import_pyarrow()
+    schema = pa.schema([(name, pa.string()) for name in COLUMNS])
+    metadata = dict(metadata or {})
+    metadata.update(
+        {
+            "created": dt.datetime.now().isoformat(timespec="seconds"),
+            "version": _get_version(),
+            "shape": list(result.shape),
+            "total": result.total,
+            "column_counts": {
+                str(col): int(count)
+                for col, count in result.column_counts.items()
+            },
+        }
+    )
+    schema = schema.with_metadata(
+        {METADATA_KEY: json.dumps(metadata, default=str).encode("utf-8")}
+    )
+
+    # Only the rows with differences are ordered by their key
+    positions = np.flatnonzero(result.row_counts.to_numpy() > 0)
+    keys = result.df_1.index[positions].map(str).to_numpy(dtype=object)
+    positions = positions[np.argsort(keys, kind="stable")]
+    with pq.ParquetWriter(str(path), schema) as writer:
+        for df_block in result.iter_difference_frames(
+            row_group_size, positions
+        ):
+            df_block = df_block.rename(columns={"index": "key"}).astype(str)
+            writer.write_table(
+                pa.Table.from_pandas(df_block, schema, preserve_index=False)
+            )
+    print(f"- Differences archived to '{path}'")
+
+
+def read_archive_metadata(path: Union[str, Path]) -> Dict[str, Any]:
+    """Return the metadata stored in the archive, without reading any
+    of the differences.
+    """
+    _, pq = _import_pyarrow()
+    schema = pq.read_schema(str(path))
+    if schema.metadata is None or METADATA_KEY not in schema.metadata:
+        raise ValueError(f"'{path}' is not a diff archive.")
+    return json.loads(schema.metadata[METADATA_KEY].decode("utf-8"))
+
+
+def query_archive(
+    path: Union[str, Path],
+    keys: Optional[Sequence[Any]] = None,
+    columns: Optional[Sequence[Any]] = None,
+) -> pd.DataFrame:
+    """Return the archived differences for the passed keys and / or
+    columns (compared as str), all differences if none are passed. Row
+    groups whose min / max statistics exclude all of the requested
+    values are not read.
+    """
+    pa, pq = _import_pyarrow()
+    read_archive_metadata(path)  # Fail early for other Parquet files
+    keys = None if keys is None else sorted(str(key) for key in keys)
+    columns = None if columns is None else sorted(str(c) for c in columns)
+
+    parquet_file = pq.ParquetFile(str(path))
+    file_metadata = parquet_file.metadata
+    row_groups = [
+        i
+        for i in range(file_metadata.num_row_groups)
+        if _may_contain(file_metadata.row_group(i).column(0), keys)
+        and _may_contain(file_metadata.row_group(i).column(1), columns)
+    ]
+    table = parquet_file.read_row_groups(row_groups, columns=COLUMNS)
+
+    import pyarrow.compute as pc
+
+    for name, values in [("key", keys), ("column", columns)]:
+        if values is not None:
+            table = table.filter(
+                pc.is_in(table[name], value_set=pa.array(values, pa.string()))
+            )
+    return table.to_pandas()
+
+
+def _may_contain(
+    column_chunk: Any, values: Optional[Sequence[str]] = None
+) -> bool:
+    """Check if the min / max statistics of the column chunk allow that
+    it contains any of the passed (sorted) values. This function is
+    called within `query_archive`.
+    """
+    if values is None:
+        return True
+    statistics = column_chunk.statistics
+    if statistics is None or not statistics.has_min_max:
+        return True
+    start = np.searchsorted(values, statistics.min, side="left")
+    return start < len(values) and values[start] <= statistics.max
+
+
+def print_archive(path: Union[str, Path], df: pd.DataFrame) -> None:
+    """Print the metadata of the archive and the queried differences."""
+    metadata = read_archive_metadata(path)
+    print(f"\nDiff archive '{path}', created {metadata['created']}:")
+    for name in ["inputs", "load_params", "sample_rate", "shape", "total"]:
+        if name in metadata:
+            print(f"- {name}: {metadata[name]}")
+    print(f"\n{len(df)} matching difference(s):\n")
+    if len(df) > 0:
+        print(df.to_string(index=False))
+
+
+def _get_version() -> str:
+    """Return the version of the package. This function is called
+    within `write_archive`.
+    """
+    import compare_df
+
+    return compare_df.__version__
@@ -4,10 +4,30 @@ This is the script version.
 Usage:
 ------
     $ compare_df [options] [path_1] [path_2]
+    $ zcat data.csv.gz | compare_df [options] [path_1] -
+    $ compare_df --serve [--host HOST] [--port PORT]
+    $ compare_df --query ARCHIVE [--keys KEY ...] [--columns COLUMN ...]
 
 Available options are:
     -l_1, --load_params_1   Load params for file 1
     -l_2, --load_params_2   Load params for file 2
+    -u, --unkeyed           Compare rows regardless of index and order
+    -s, --sample_rate       Compare a sample of the rows only (estimate)
+    -a, --abs_tol           Absolute tolerance for numeric values
+    -r, --rel_tol           Relative tolerance for numeric values
+    -t, --datetime_tol      Tolerance window for datetime values
+    -w, --workbook          Compare all sheets of two XLSX files
+    --max_workers           Number of processes for the workbook mode
+    --explain               Only print the planned execution strategy
+    --strategy              auto (default), in-memory or sampled
+    --serve                 Start the resident comparison server
+    -c, --client            Let the running server do the comparison
+    -o, --output            CSV output path for the differences (client)
+    --host, --port          Address of the comparison server
+    --max_baselines         Number of baselines kept loaded by the server
+    --archive               Parquet path to archive the differences to
+    --query                 Look up differences in an archive
+    --keys, --columns       Keys / columns to look up in the archive
 
 Contact:
 --------
@@ -23,8 +43,10 @@ Version:
 
 
 import argparse
+from typing import Any, Callable, Dict, List, Optional, Union
 
-from compare_df.__main__ import main
+from compare_df import streams
+from compare_df.client import DEFAULT_HOST, DEFAULT_PORT, run_client
 
 arg_parser = argparse.ArgumentParser(
     description="".join(
@@ -35,10 +57,16 @@ arg_parser = argparse.ArgumentParser(
     )
 )
 arg_parser.add_argument(
-    "path_1", help="Path to the first .XLSX or .CSV file", type=str
+    "path_1",
+    help="Path to the first .XLSX or (compressed) .CSV file, or - for stdin",
+    type=str,
+    nargs="?",
 )
 arg_parser.add_argument(
-    "path_2", help="Path to the second .XLSX or .CSV file", type=str
+    "path_2",
+    help="Path to the second .XLSX or (compressed) .CSV file, or - for stdin",
+    type=str,
+    nargs="?",
 )
 arg_parser.add_argument(
     "-l_1",
@@ -66,6 +94,198 @@ arg_parser.add_argument(
     ),
     default=None,
 )
+arg_parser.add_argument(
+    "-u",
+    "--unkeyed",
+    action="store_true",
+    help=(
+        "Ignore the index and the row order and compare the files as "
+        "multisets of full rows. Use this for data without a natural key."
+    ),
+)
+arg_parser.add_argument(
+    "-s",
+    "--sample_rate",
+    type=float,
+    help=(
+        "Load and compare only a deterministic sample of this share of "
+        "the index values (e.g. 0.01) and estimate the difference rates "
+        "per column. Defaults to None (exact comparison)."
+    ),
+    default=None,
+)
+arg_parser.add_argument(
+    "-a",
+    "--abs_tol",
+    action="append",
+    help=(
+        "Absolute tolerance for numeric values, either for all columns "
+        "(e.g. `0.001`) or for a specific column (e.g. `'price'=0.01`, "
+        "you can pass multiple pairs). Defaults to None."
+    ),
+    default=None,
+)
+arg_parser.add_argument(
+    "-r",
+    "--rel_tol",
+    action="append",
+    help=(
+        "Relative tolerance for numeric values, relative to the values "
+        "of the second file. Same format as --abs_tol. Defaults to None."
+    ),
+    default=None,
+)
+arg_parser.add_argument(
+    "-t",
+    "--datetime_tol",
+    action="append",
+    help=(
+        "Tolerance window for datetime values, e.g. `1s` or `2 days`. "
+        "Same format as --abs_tol. Defaults to None."
+    ),
+    default=None,
+)
+arg_parser.add_argument(
+    "-w",
+    "--workbook",
+    action="store_true",
+    help=(
+        "Compare all sheets with the same name of two XLSX files, "
+        "concurrently in a process pool."
+    ),
+)
+arg_parser.add_argument(
+    "--max_workers",
+    type=int,
+    help=(
+        "Max number of processes for the workbook mode. Defaults to "
+        "the number of processors."
+    ),
+    default=None,
+)
+arg_parser.add_argument(
+    "--explain",
+    action="store_true",
+    help=(
+        "Dry run: Only estimate the size of the files and print the "
+        "planned execution strategy, without comparing them."
+    ),
+)
+arg_parser.add_argument(
+    "--strategy",
+    choices=["auto", "in-memory", "sampled"],
+    help=(
+        "Execution strategy. With `auto` the size of CSV files is "
+        "estimated first and the process stops if they do not fit into "
+        "memory. Pass `sampled` to compare a sample of the rows in that "
+        "case, or `in-memory` to skip the estimation. Defaults to auto."
+    ),
+    default="auto",
+)
+arg_parser.add_argument(
+    "--serve",
+    action="store_true",
+    help=(
+        "Start a resident comparison server that keeps Pandas imported "
+        "and the baselines (path_1) loaded between requests."
+    ),
+)
+arg_parser.add_argument(
+    "-c",
+    "--client",
+    action="store_true",
+    help=(
+        "Send the paths and load params to the running comparison server "
+        "instead of comparing in this process. The server answers "
+        "non-interactively: Non-overlapping columns are dropped."
+    ),
+)
+arg_parser.add_argument(
+    "-o",
+    "--output",
+    type=str,
+    help=(
+        "Client and query only: Path to save the differences to, "
+        "in CSV format."
+    ),
+    default=None,
+)
+arg_parser.add_argument(
+    "--host",
+    type=str,
+    help=(
+        "Host of the comparison server, only loopback addresses are "
+        f"accepted. Defaults to {DEFAULT_HOST}."
+    ),
+    default=DEFAULT_HOST,
+)
+arg_parser.add_argument(
+    "--port",
+    type=int,
+    help=f"Port of the comparison server. Defaults to {DEFAULT_PORT}.",
+    default=DEFAULT_PORT,
+)
+arg_parser.add_argument(
+    "--max_baselines",
+    type=int,
+    help="Number of baselines kept loaded by the server. Defaults to 8.",
+    default=8,
+)
+arg_parser.add_argument(
+    "--archive",
+    type=str,
+    help=(
+        "Path to a Parquet file to archive the differing values to, with "
+        "metadata about the inputs and the run, for later lookup with "
+        "--query. Requires pyarrow. Not with -w, -c or -u."
+    ),
+    default=None,
+)
+arg_parser.add_argument(
+    "--query",
+    type=str,
+    metavar="ARCHIVE",
+    help=(
+        "Print the archived differences for the passed --keys and / or "
+        "--columns (all if none are passed), save them with -o."
+    ),
+    default=None,
+)
+arg_parser.add_argument(
+    "--keys",
+    nargs="+",
+    help="Query only: Keys (index values) to look up.",
+    default=None,
+)
+arg_parser.add_argument(
+    "--columns",
+    nargs="+",
+    help="Query only: Columns to look up.",
+    default=None,
+)
+
+
+def parse_tolerance(
+    values: Optional[List[str]], convert: Callable = float
+) -> Union[Any, Dict[str, Any], None]:
+    """Return the tolerance for all columns if a single value is
+    passed, or a dict with the tolerances for specific columns if
+    key-value-pairs are passed.
+    """
+    if not values:
+        return None
+    if len(values) == 1 and "=" not in values[0]:
+        return convert(values[0])
+    tolerances = {}
+    for value in values:
+        if "=" not in value:
+            arg_parser.error(
+                "pass either one tolerance for all columns or "
+                "key-value-pairs for specific columns"
+            )
+        col, tol = value.rsplit("=", 1)
+        tolerances[col] = convert(tol)
+    return tolerances
 
 
 def cli() -> None:
@@ -75,6 +295,31 @@ def cli() -> None:
     """
     args = arg_parser.parse_args()
 
+    if args.serve:
+        from compare_df.server import serve
+
+        try:
+            serve(args.host, args.port, args.max_baselines)
+        except ValueError as e:
+            arg_parser.error(str(e))
+        return
+    if args.query:
+        from compare_df import archive
+
+        df = archive.query_archive(args.query, args.keys, args.columns)
+        archive.print_archive(args.query, df)
+        if args.output is not None:
+            df.to_csv(args.output, index=False)
+        return
+    if args.path_1 is None or args.path_2 is None:
+        arg_parser.error("the arguments path_1 and path_2 are required")
+    if args.workbook and args.strategy == "sampled":
+        arg_parser.error("the strategy sampled is not allowed with -w")
+    if args.archive and (args.workbook or args.client or args.unkeyed):
+        arg_parser.error(
+            "the argument --archive is not allowed with -w, -c or -u"
+        )
+
     path_1 = args.path_1
     path_2 = args.path_2
     if args.load_params_1:
@@ -85,8 +330,71 @@ def cli() -> None:
         load_params_2 = dict(args.load_params_2)
     else:
         load_params_2 = args.load_params_2
+    tolerances = {
+        "abs_tol": parse_tolerance(args.abs_tol),
+        "rel_tol": parse_tolerance(args.rel_tol),
+        "datetime_tol": parse_tolerance(args.datetime_tol, str),
+    }
+
+    if args.explain:
+        from compare_df import planner
+
+        try:
+            plan = planner.plan_comparison(
+                path_1,
+                path_2,
+                load_params_1,
+                load_params_2,
+                unkeyed=args.unkeyed,
+                workbook=args.workbook,
+            )
+        except TypeError as e:
+            arg_parser.error(str(e))
+        planner.print_plan(plan)
+    elif args.client:
+        run_client(
+            path_1,
+            path_2,
+            load_params_1,
+            load_params_2,
+            unkeyed=args.unkeyed,
+            sample_rate=args.sample_rate,
+            tolerances=tolerances,
+            output=args.output,
+            host=args.host,
+            port=args.port,
+        )
+    elif args.workbook:
+        from compare_df.workbook import compare_workbooks
+
+        compare_workbooks(
+            path_1,
+            path_2,
+            load_params_1,
+            load_params_2,
+            max_workers=args.max_workers,
+            unkeyed=args.unkeyed,
+            sample_rate=args.sample_rate,
+            **tolerances,
+            strategy=args.strategy,
+        )
+    else:
+        from compare_df.__main__ import main
 
-    main(path_1, path_2, load_params_1, load_params_2)
+        # Prompts can not be answered if the data is piped to stdin
+        interactive = streams.STDIN not in [path_1, path_2]
+        main(
+            path_1,
+            path_2,
+            load_params_1,
+            load_params_2,
+            unkeyed=args.unkeyed,
+            interactive=interactive,
+            sample_rate=args.sample_rate,
+            **tolerances,
+            strategy=args.strategy,
+            archive_path=args.archive,
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,75 @@
+"""Compare Data From The Command Line
+This is the thin client for the resident server (see
+`compare_df.server`). It does not import Pandas, it only sends the
+paths and load params and prints the returned summary.
+"""
+
+import csv
+import json
+import socket
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+def send_request(
+    request: Dict[str, Any], host: str = DEFAULT_HOST, port: int = DEFAULT_PORT
+) -> Dict[str, Any]:
+    """Send a request to the comparison server and return the decoded
+    response.
+    """
+    with socket.create_connection((host, port)) as sock:
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as response:
+            return json.loads(response.readline().decode("utf-8"))
+
+
+def run_client(
+    path_1: str,
+    path_2: str,
+    load_params_1: Optional[Dict[str, str]] = None,
+    load_params_2: Optional[Dict[str, str]] = None,
+    unkeyed: bool = False,
+    sample_rate: Optional[float] = None,
+    tolerances: Optional[Dict[str, Any]] = None,
+    output: Optional[str] = None,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+) -> None:
+    """Let the server compare the file at `path_2` with the baseline at
+    `path_1` and print the summary. If an `output` path is passed and
+    there are differences, save them to that path in CSV format. The
+    `tolerances` are passed as a dict with the keys `abs_tol`, `rel_tol`
+    and `datetime_tol` (see `compare_df.main`).
+    """
+    if "-" in [path_1, path_2]:
+        raise SystemExit("Reading from stdin is not possible in client mode.")
+    request = {
+        "path_1": str(Path(path_1).resolve()),
+        "path_2": str(Path(path_2).resolve()),
+        "load_params_1": load_params_1,
+        "load_params_2": load_params_2,
+        "unkeyed": unkeyed,
+        "sample_rate": sample_rate,
+        "rows": output is not None,
+        **(tolerances or {}),
+    }
+    try:
+        response = send_request(request, host, port)
+    except ConnectionRefusedError:
+        raise SystemExit(
+            f"No comparison server running on {host}:{port}. "
+            "Start it with `compare_df --serve`, please."
+        )
+    if "error" in response:
+        raise SystemExit(f"Comparison failed on server: {response['error']}")
+
+    print(response["summary"], end="")
+    if output is not None and len(response.get("rows", [])) > 0:
+        with open(output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(response["columns"])
+            writer.writerows(response["rows"])
+        print(f"\nOutput saved to: \n{Path(output).absolute()}")
@@ -0,0 +1,367 @@
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import (
+    is_bool_dtype,
+    is_datetime64_any_dtype,
+    is_numeric_dtype,
+)
+
+Tolerance = Union[float, Dict[Hashable, float], None]
+DatetimeTolerance = Union[
+    str, pd.Timedelta, Dict[Hashable, Union[str, pd.Timedelta]], None
+]
+
+
+class DiffResult:
+    """Result of the cell-level comparison of two aligned dataframes
+    (same columns in the same order, same index values). Nothing is
+    computed on instantiation. On first access, all columns without a
+    tolerance are compared in one vectorized pass (columns with a
+    tolerance one by one), the boolean mask is cached as `df_diff` and
+    the per-column counts, per-row counts and the total are derived
+    from it.
+
+    Optionally, numeric values are treated as equal if
+    `|value_1 - value_2| <= abs_tol + rel_tol * |value_2|` and datetime
+    values if they are at most `datetime_tol` apart. Each tolerance is
+    either a single value for all columns or a dict with values for
+    specific columns. They are only applied to columns of numeric
+    (respectively datetime) dtype in both dataframes, all other columns
+    are compared exactly.
+
+    The columns at the positions passed as `equal_columns` are known to
+    be identical (see `foos.find_identical_columns`) and not compared.
+    """
+
+    def __init__(
+        self,
+        df_1: pd.DataFrame,
+        df_2: pd.DataFrame,
+        abs_tol: Tolerance = None,
+        rel_tol: Tolerance = None,
+        datetime_tol: DatetimeTolerance = None,
+        equal_columns: Optional[List[int]] = None,
+    ) -> None:
+        self.df_1 = df_1
+        self.df_2 = df_2
+        self.abs_tol = abs_tol
+        self.rel_tol = rel_tol
+        self.datetime_tol = datetime_tol
+        self.equal_columns = set(equal_columns or [])
+        self._column_counts: Optional[pd.Series] = None
+        self._row_counts: Optional[pd.Series] = None
+        self._df_diff: Optional[pd.DataFrame] = None
+        self._examples: Dict[int, pd.DataFrame] = {}
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Shape of the compared dataframes."""
+        return self.df_1.shape
+
+    @property
+    def column_counts(self) -> pd.Series:
+        """Number of differing values per column."""
+        if self._column_counts is None:
+            self._count_differences()
+        return self._column_counts
+
+    @property
+    def row_counts(self) -> pd.Series:
+        """Number of differing values per row."""
+        if self._row_counts is None:
+            self._count_differences()
+        return self._row_counts
+
+    @property
+    def total(self) -> int:
+        """Total number of differing values."""
+        return int(self.column_counts.sum())
+
+    @property
+    def df_diff(self) -> pd.DataFrame:
+        """Boolean dataframe indicating the exact positions of the
+        differing values ("True"). If nothing was compared, an empty
+        dataframe is returned.
+        """
+        if self.df_1.empty and self.df_2.empty:
+            return pd.DataFrame()
+        if self._df_diff is None:
+            self._df_diff = pd.DataFrame(
+                self._compute_mask(),
+                index=self.df_1.index,
+                columns=self.df_1.columns,
+                dtype=bool,
+            )
+        return self._df_diff
+
+    @property
+    def has_tolerances(self) -> bool:
+        """True if any tolerance is set."""
+        return any(
+            tol is not None
+            for tol in [self.abs_tol, self.rel_tol, self.datetime_tol]
+        )
+
+    def examples(self, n: int = 10) -> pd.DataFrame:
+        """Return the first `n` differing values (column by column) in
+        long format with the columns `index`, `column`, `value_df_1`
+        and `value_df_2`.
+        """
+        if n not in self._examples:
+            rows = []
+            for row in self.iter_differences():
+                if len(rows) == n:
+                    break
+                rows.append(row)
+            self._examples[n] = pd.DataFrame(
+                rows, columns=["index", "column", "value_df_1", "value_df_2"]
+            )
+        return self._examples[n]
+
+    def iter_differences(
+        self,
+    ) -> Iterator[Tuple[Hashable, Hashable, Any, Any]]:
+        """Yield a tuple `(index, column, value_df_1, value_df_2)` for
+        each differing value, column by column. Only the mask of the
+        current column is held in memory. Columns that are known to be
+        equal from the cached counts are skipped.
+        """
+        for position, col in enumerate(self.df_1.columns):
+            if (
+                self._column_counts is not None
+                and self._column_counts.iloc[position] == 0
+            ):
+                continue
+            for row in np.flatnonzero(self._column_mask(position)):
+                yield (
+                    self.df_1.index[row],
+                    col,
+                    self.df_1.iat[row, position],
+                    self.df_2.iat[row, position],
+                )
+
+    def iter_difference_frames(
+        self, n_rows: int = 100_000, positions: Optional[np.ndarray] = None
+    ) -> Iterator[pd.DataFrame]:
+        """Yield the differing values in long format (see `examples`)
+        for consecutive blocks of `n_rows` rows, ordered by row. If row
+        positions are passed, the rows are taken in that order. The
+        cached mask of `df_diff` is reused (computed if needed), only
+        the differing values are gathered from the dataframes.
+        """
+        mask = self.df_diff.to_numpy()
+        if mask.size == 0:
+            return
+        if positions is None:
+            positions = np.arange(len(self.df_1))
+        for start in range(0, len(positions), n_rows):
+            block = np.asarray(positions[start : start + n_rows])
+            rows, cols = np.nonzero(mask[block])  # Ordered by row
+            if len(rows) == 0:
+                continue
+            row_positions = block[rows]
+            values_1 = np.empty(len(rows), dtype=object)
+            values_2 = np.empty(len(rows), dtype=object)
+            for position in np.unique(cols):
+                selected = cols == position
+                for df, values in zip(
+                    [self.df_1, self.df_2], [values_1, values_2]
+                ):
+                    values[selected] = (
+                        df.iloc[:, position]
+                        .iloc[row_positions[selected]]
+                        .to_numpy(dtype=object)
+                    )
+            yield pd.DataFrame(
+                {
+                    "index": self.df_1.index[row_positions].to_numpy(
+                        dtype=object
+                    ),
+                    "column": self.df_1.columns[cols],
+                    "value_df_1": values_1,
+                    "value_df_2": values_2,
+                }
+            )
+
+    def _column_mask(self, position: int) -> np.ndarray:
+        """Return the boolean mask of differing values for the column
+        at the passed position.
+        """
+        if self._df_diff is not None:
+            return self._df_diff.iloc[:, position].to_numpy()
+        if position in self.equal_columns:
+            return np.zeros(len(self.df_1), dtype=bool)
+        col = self.df_1.columns[position]
+        return self._mask(
+            col, self.df_1.iloc[:, position], self.df_2.iloc[:, position]
+        )
+
+    def _mask(
+        self, col: Hashable, col_1: pd.Series, col_2: pd.Series
+    ) -> np.ndarray:
+        """Return the boolean mask of differing values of the passed
+        (parts of) columns, taking the tolerances into account.
+        """
+        mask = col_1.ne(col_2).to_numpy()
+        if not mask.any() or not self.has_tolerances:
+            return mask
+
+        if _is_numeric(col_1.dtype) and _is_numeric(col_2.dtype):
+            abs_tol = _get_tolerance(self.abs_tol, col) or 0.0
+            rel_tol = _get_tolerance(self.rel_tol, col) or 0.0
+            if abs_tol > 0 or rel_tol > 0:
+                values_1, values_2 = col_1.to_numpy(), col_2.to_numpy()
+                if values_1.dtype.kind == values_2.dtype.kind in "iu":
+                    isclose = _isclose_int
+                else:
+                    isclose = _isclose
+                    values_1 = col_1.to_numpy(dtype="float64", na_value=np.nan)
+                    values_2 = col_2.to_numpy(dtype="float64", na_value=np.nan)
+                mask &= ~isclose(values_1, values_2, abs_tol, rel_tol)
+        elif _is_datetime(col_1.dtype) and _is_datetime(col_2.dtype):
+            window = _get_tolerance(self.datetime_tol, col)
+            if window is not None:
+                within = (col_1 - col_2).abs() <= pd.Timedelta(window)
+                mask &= ~within.to_numpy()
+        return mask
+
+    def _compute_mask(self) -> np.ndarray:
+        """Return the 2D boolean mask of differing values. All columns
+        without a tolerance are compared in one vectorized pass, only
+        the columns with a tolerance are compared one by one.
+        """
+        n_cols = self.df_1.shape[1]
+        tolerance_positions = self._tolerance_positions()
+        block = [
+            position
+            for position in range(n_cols)
+            if position not in self.equal_columns
+            and position not in tolerance_positions
+        ]
+        if len(block) == n_cols:
+            mask = self.df_1.ne(self.df_2).to_numpy(dtype=bool)
+        else:
+            mask = np.zeros(self.df_1.shape, dtype=bool)
+            if len(block) > 0:
+                mask[:, block] = (
+                    self.df_1.iloc[:, block]
+                    .ne(self.df_2.iloc[:, block])
+                    .to_numpy(dtype=bool)
+                )
+            for position in tolerance_positions:
+                mask[:, position] = self._column_mask(position)
+        return mask
+
+    def _tolerance_positions(self) -> List[int]:
+        """Return the positions of the columns a tolerance applies to,
+        see class docstring.
+        """
+        if not self.has_tolerances:
+            return []
+        positions = []
+        for position, (col, dtype_1, dtype_2) in enumerate(
+            zip(self.df_1.columns, self.df_1.dtypes, self.df_2.dtypes)
+        ):
+            if position not in self.equal_columns and tolerance_applies(
+                col,
+                dtype_1,
+                dtype_2,
+                self.abs_tol,
+                self.rel_tol,
+                self.datetime_tol,
+            ):
+                positions.append(position)
+        return positions
+
+    def _count_differences(self) -> None:
+        """Compute and cache the per-column and per-row counts from the
+        mask of differing values, which is kept as `df_diff`.
+        """
+        if self.df_1.empty and self.df_2.empty:
+            mask = np.zeros(self.df_1.shape, dtype=bool)
+        else:
+            mask = self.df_diff.to_numpy()
+        self._column_counts = pd.Series(
+            mask.sum(axis=0), index=self.df_1.columns, dtype="int64"
+        )
+        self._row_counts = pd.Series(
+            mask.sum(axis=1), index=self.df_1.index, dtype="int64"
+        )
+
+
+def tolerance_applies(
+    col: Hashable,
+    dtype_1: Any,
+    dtype_2: Any,
+    abs_tol: Tolerance = None,
+    rel_tol: Tolerance = None,
+    datetime_tol: DatetimeTolerance = None,
+) -> bool:
+    """Check if any of the tolerances applies to the column with the
+    passed dtypes, see `DiffResult`.
+    """
+    if _is_numeric(dtype_1) and _is_numeric(dtype_2):
+        return (_get_tolerance(abs_tol, col) or 0.0) > 0 or (
+            _get_tolerance(rel_tol, col) or 0.0
+        ) > 0
+    if _is_datetime(dtype_1) and _is_datetime(dtype_2):
+        return _get_tolerance(datetime_tol, col) is not None
+    return False
+
+
+def _get_tolerance(tolerance: Union[Tolerance, DatetimeTolerance], col):
+    """Return the tolerance for the passed column, either the single
+    value for all columns or the value for this column (if any).
+    """
+    if isinstance(tolerance, dict):
+        return tolerance.get(col)
+    return tolerance
+
+
+def _is_numeric(dtype: Any) -> bool:
+    """Check if the dtype is a native numeric dtype (no booleans)."""
+    return is_numeric_dtype(dtype) and not is_bool_dtype(dtype)
+
+
+def _is_datetime(dtype: Any) -> bool:
+    """Check if the dtype is a native datetime dtype."""
+    return is_datetime64_any_dtype(dtype)
+
+
+def _isclose(
+    values_1: np.ndarray, values_2: np.ndarray, abs_tol: float, rel_tol: float
+) -> np.ndarray:
+    """Vectorized tolerance check in the style of `np.isclose`: Return
+    True where `|values_1 - values_2| <= abs_tol + rel_tol * |values_2|`.
+    """
+    with np.errstate(invalid="ignore"):
+        margin = abs_tol + rel_tol * np.abs(values_2)
+        return np.abs(values_1 - values_2) <= margin
+
+
+def _isclose_int(
+    values_1: np.ndarray, values_2: np.ndarray, abs_tol: float, rel_tol: float
+) -> np.ndarray:
+    """Integer version of `_isclose`: The absolute difference is computed
+    exactly in (unsigned) integer space, so that values above 2**53 are
+    not rounded together as in float64.
+    """
+    # The wrapped unsigned difference is exact if taken from the larger
+    diff = np.where(
+        values_1 >= values_2,
+        values_1.astype("uint64") - values_2.astype("uint64"),
+        values_2.astype("uint64") - values_1.astype("uint64"),
+    )
+    margin = abs_tol + rel_tol * np.abs(values_2.astype("float64"))
+    return diff <= margin
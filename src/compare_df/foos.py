@@ -1,9 +1,30 @@
 import datetime as dt
+import io
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
+from typing import BinaryIO, Dict, Hashable, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
+from compare_df import streams
+from compare_df.diff_result import (
+    DatetimeTolerance,
+    DiffResult,
+    Tolerance,
+    tolerance_applies,
+)
+
+SAMPLE_CHUNK_SIZE = 1_000_000
+# Load params that refer to specific columns, see `_detect_separator`
+SEPARATOR_DETECTION_IGNORED_PARAMS = [
+    "index_col",
+    "usecols",
+    "dtype",
+    "parse_dates",
+    "converters",
+    "names",
+]
+
 
 def check_input_type(
     frame_1: Union[str, Path, pd.DataFrame],
@@ -28,10 +49,14 @@ def check_input_type(
 def indentify_file_format(path_1, path_2) -> str:
     """If filepaths are passed, return a suffix string indicating if
     it is Excel or CSV files. If it neither or if the formats differ
-    for the two files, raise an exception.
+    for the two files, raise an exception. Compression suffixes of
+    CSV files are ignored, and "-" (stdin) is accepted as CSV for one
+    of the files.
     """
-    suffix_1 = Path(path_1).suffix
-    suffix_2 = Path(path_2).suffix
+    if str(path_1) == str(path_2) == streams.STDIN:
+        raise ValueError("Only one of the files can be read from stdin.")
+    suffix_1 = streams.strip_compression_suffix(path_1)
+    suffix_2 = streams.strip_compression_suffix(path_2)
     if suffix_1 != suffix_2:
         raise AssertionError("File format mismatch. Same file types expected.")
     if suffix_1 not in [".xlsx", ".csv"]:
@@ -45,50 +70,90 @@ def load_files(
     file_format: str,
     load_params_1: Optional[Dict[str, str]] = None,
     load_params_2: Optional[Dict[str, str]] = None,
+    interactive: bool = True,
+    sample_rate: Optional[float] = None,
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """Load data from files and return Pandas DataFrames. Optional load
     params for each of them can be specified (according to `pd.read_csv()`
-    and `pd.read_excel()` functions).
+    and `pd.read_excel()` functions). If a `sample_rate` is passed, only
+    a sample of the rows is kept, see `sample_by_key`.
 
     Note: If no engine param is specified for excel reading, `openpyxl`
     is set as default.
     """
     dataframes = []
-    if load_params_1 is None:
-        load_params_1 = {}
-    if load_params_2 is None:
-        load_params_2 = {}
-    for path, params in {path_1: load_params_1, path_2: load_params_2}.items():
-        try:
-            Path(path).exists()
-        except FileNotFoundError:
-            raise SystemExit(
-                f"File at path {path} does not exist. Try again, please."
-            )
-
-        if file_format == ".csv":
-            df = _read_csv(path, params)
-        else:
-            if params.get("engine") is None:
-                params["engine"] = "openpyxl"
-            df = pd.read_excel(path, **params)
-
-        print(f"- DF loaded, with original shape of {df.shape}")
+    for path, params in [(path_1, load_params_1), (path_2, load_params_2)]:
+        df = load_file(path, file_format, params, interactive, sample_rate)
         dataframes.append(df)
 
     return dataframes[0], dataframes[1]
 
 
-def _read_csv(path: Union[str, Path], params: Dict) -> pd.DataFrame:
-    """Read csv file into a dataframe handling some common issues."""
+def load_file(
+    path: Union[str, Path],
+    file_format: str,
+    load_params: Optional[Dict[str, str]] = None,
+    interactive: bool = True,
+    sample_rate: Optional[float] = None,
+) -> pd.DataFrame:
+    """Load data from a single file and return a Pandas DataFrame. This
+    function is called within `load_files`, see there for details. CSV
+    files are read in chunks when sampling, so that only the sample
+    has to be held in memory. Compressed CSV files and stdin ("-") are
+    streamed to the parser, see `streams.open_csv_source`.
+    """
+    params = {} if load_params is None else dict(load_params)
+    try:
+        Path(path).exists()
+    except FileNotFoundError:
+        raise SystemExit(
+            f"File at path {path} does not exist. Try again, please."
+        )
+
+    if file_format == ".csv":
+        source = streams.open_csv_source(path)
+        try:
+            if sample_rate is not None:
+                df = _read_csv_sampled(source, params, sample_rate)
+            else:
+                df = _read_csv(source, params, interactive)
+        finally:
+            if source is not path:
+                source.close()
+    else:
+        if params.get("engine") is None:
+            params["engine"] = "openpyxl"
+        df = pd.read_excel(path, **params)
+        if sample_rate is not None:
+            df = sample_by_key(df, sample_rate)
+
+    if sample_rate is not None:
+        print(f"- DF loaded, with sampled shape of {df.shape}")
+    else:
+        print(f"- DF loaded, with original shape of {df.shape}")
+    return df
+
+
+def _read_csv(
+    path: Union[str, Path, BinaryIO], params: Dict, interactive: bool = True
+) -> pd.DataFrame:
+    """Read csv file into a dataframe handling some common issues. A
+    stream can only be read once, so its separator is detected from
+    the first row before reading.
+    """
+    detect_separator = params == {}
+    is_stream = not isinstance(path, (str, Path))
+    if detect_separator and is_stream:
+        params = {"sep": _detect_separator(path, params)}
     df = pd.read_csv(path, **params)
-    if df.shape[1] == 1 and params == {}:
-        for separator in [",", ";", "\t", "|"]:
-            df = pd.read_csv(filepath_or_buffer=path, sep=f"{separator}")
-            if len(df.columns) > 1:
-                break
+    if df.shape[1] == 1 and detect_separator:
+        if not is_stream:
+            for separator in [",", ";", "\t", "|"]:
+                df = pd.read_csv(filepath_or_buffer=path, sep=f"{separator}")
+                if len(df.columns) > 1:
+                    break
         if df.shape[1] == 1:
-            user_input = get_user_input("width_of_one")
+            user_input = get_user_input("width_of_one", interactive)
             if user_input == "y":
                 pass
             elif user_input == "n":
@@ -96,6 +161,59 @@ def _read_csv(path: Union[str, Path], params: Dict) -> pd.DataFrame:
     return df
 
 
+def _read_csv_sampled(
+    path: Union[str, Path, BinaryIO], params: Dict, sample_rate: float
+) -> pd.DataFrame:
+    """Read csv file in chunks and keep only a sample of the rows from
+    each chunk, see `sample_by_key`. If no separator is specified, it
+    is detected from the first row.
+    """
+    if "sep" not in params and "delimiter" not in params:
+        params["sep"] = _detect_separator(path, params)
+    chunks = pd.read_csv(path, chunksize=SAMPLE_CHUNK_SIZE, **params)
+    return pd.concat(sample_by_key(chunk, sample_rate) for chunk in chunks)
+
+
+def _detect_separator(path: Union[str, Path, BinaryIO], params: Dict) -> str:
+    """Return the first of the common separators that splits the
+    header and the first data row of a csv file into more than one
+    column (defaults to a comma). For a stream, these rows are peeked
+    at without consuming them. Params that refer to specific columns
+    are ignored for the detection.
+    """
+    params = {
+        key: value
+        for key, value in params.items()
+        if key not in SEPARATOR_DETECTION_IGNORED_PARAMS
+    }
+    first_rows = None
+    if not isinstance(path, (str, Path)):
+        first_rows = b"\n".join(
+            path.peek(streams.CHUNK_SIZE).split(b"\n")[:2]
+        )
+    for separator in [",", ";", "\t", "|"]:
+        source = path if first_rows is None else io.BytesIO(first_rows)
+        try:
+            df = pd.read_csv(source, nrows=1, sep=separator, **params)
+        except (ValueError, TypeError):
+            continue
+        if len(df.columns) > 1:
+            return separator
+    return ","
+
+
+def sample_by_key(df: pd.DataFrame, sample_rate: float) -> pd.DataFrame:
+    """Return a deterministic sample of the rows, selected by the hash
+    of their index values. Because the same index values are selected
+    for both dataframes, the samples can be aligned and compared like
+    the full dataframes.
+    """
+    if not 0 < sample_rate <= 1:
+        raise ValueError("Invalid sample rate. It has to be in (0, 1].")
+    hashes = pd.util.hash_pandas_object(df.index, index=False).to_numpy()
+    return df.loc[hashes / 2.0 ** 64 < sample_rate]
+
+
 def impute_missing_values(
     df_1: pd.DataFrame, df_2: pd.DataFrame
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
@@ -108,6 +226,39 @@ def impute_missing_values(
     )
 
 
+def check_for_tolerances_on_missing_values(
+    df_1: pd.DataFrame,
+    df_2: pd.DataFrame,
+    abs_tol: Tolerance = None,
+    rel_tol: Tolerance = None,
+    datetime_tol: DatetimeTolerance = None,
+) -> List[Hashable]:
+    """Before imputation: Return the columns a tolerance would apply to
+    that have missing values. They are of `object` type after the
+    imputation and compared exactly, so print a warning naming them.
+    """
+    columns = [
+        col
+        for col in df_1.columns.intersection(df_2.columns)
+        if tolerance_applies(
+            col,
+            df_1[col].dtype,
+            df_2[col].dtype,
+            abs_tol,
+            rel_tol,
+            datetime_tol,
+        )
+        and (df_1[col].isna().any() or df_2[col].isna().any())
+    ]
+    if len(columns) > 0:
+        print(
+            "- WARNING: The tolerances are not applied to the following",
+            "column(s), because they have missing values and are",
+            f"compared exactly: {columns}",
+        )
+    return columns
+
+
 def check_if_dataframes_are_equal(
     df_1: pd.DataFrame, df_2: pd.DataFrame
 ) -> bool:
@@ -149,10 +300,18 @@ def check_for_identical_dtypes(df_1: pd.DataFrame, df_2: pd.DataFrame) -> bool:
     return list(df_1.dtypes.values) == list(df_2.dtypes.values)
 
 
-def get_user_input(case: str) -> str:
+NON_INTERACTIVE_INPUT = {"columns": "y", "output": "n", "width_of_one": "y"}
+
+
+def get_user_input(case: str, interactive: bool = True) -> str:
     """Get user input on what to do if the the dataframes are of same
-    width, but the column names differ.
+    width, but the column names differ. If not `interactive`, return
+    the default answer for the case from `NON_INTERACTIVE_INPUT`
+    without prompting.
     """
+    if not interactive:
+        return NON_INTERACTIVE_INPUT[case]
+
     if case == "columns":
         INPUT_STRING = (
             "\nThe dataframes have the same number of columns, but their "
@@ -198,18 +357,22 @@ def enforce_column_identity(
 
 
 def enforce_dtype_identity(
-    df_1: pd.DataFrame, df_2: pd.DataFrame
+    df_1: pd.DataFrame,
+    df_2: pd.DataFrame,
+    skip_columns: Optional[List[int]] = None,
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """First try to enforce the dtypes other than 'object' of df_1 on
     df_2, if this is not possible for all columns, try the other way
     round. If that too is not possible for all columns, print a warning.
-    Return both dataframes with aligned dtypes where possible.
+    Return both dataframes with aligned dtypes where possible. The
+    columns at the positions in `skip_columns` (e.g. identical columns,
+    see `find_identical_columns`) are not touched.
     """
-    diff_list, df_a, df_b = _align_dtypes(df_1, df_2)
+    diff_list, df_a, df_b = _align_dtypes(df_1, df_2, skip_columns)
     if len(diff_list) == 0:
         return df_a, df_b
     else:
-        diff_list, df_b, df_a = _align_dtypes(df_2, df_1)
+        diff_list, df_b, df_a = _align_dtypes(df_2, df_1, skip_columns)
         if len(diff_list) == 0:
             return df_a, df_b
         else:
@@ -228,7 +391,9 @@ def enforce_dtype_identity(
 
 
 def _align_dtypes(
-    df_a: pd.DataFrame, df_b: pd.DataFrame
+    df_a: pd.DataFrame,
+    df_b: pd.DataFrame,
+    skip_columns: Optional[List[int]] = None,
 ) -> Tuple[List[int], pd.DataFrame, pd.DataFrame]:
     """Try to enforce the dtypes of non-object type of one dataframe
     on the other. Return a list of index values for those columns
@@ -236,8 +401,11 @@ def _align_dtypes(
     transformed). This function is called within the function
     `enforce_dtype_identity`.
     """
+    skip_columns = set(skip_columns or [])
     dtypes = [str(x) for x in df_a.dtypes]
-    for col, dtype in zip(df_b.columns, dtypes):
+    for position, (col, dtype) in enumerate(zip(df_b.columns, dtypes)):
+        if position in skip_columns:
+            continue
         try:
             if dtype.startswith("date"):
                 df_b[col] = pd.to_datetime(
@@ -254,6 +422,34 @@ def _align_dtypes(
     return diff_list, df_a, df_b
 
 
+def find_identical_columns(
+    df_1: pd.DataFrame, df_2: pd.DataFrame
+) -> List[int]:
+    """Return the positions of the columns that are identical in the
+    two aligned dataframes (same dtype and equal values in the same
+    order), by comparing the columns directly (no checksums, as hashes
+    of `object` columns can not tell e.g. 1 from "1"). If there are
+    any, print how many columns can be skipped for the dtype alignment
+    and the comparison.
+    """
+    if not df_1.index.equals(df_2.index):
+        return []
+    identical_columns = []
+    for position in range(min(df_1.shape[1], df_2.shape[1])):
+        col_1, col_2 = df_1.iloc[:, position], df_2.iloc[:, position]
+        if col_1.dtype != col_2.dtype:
+            continue
+        if col_1.equals(col_2):
+            identical_columns.append(position)
+    if len(identical_columns) > 0:
+        print(
+            f"\n{len(identical_columns)} of {df_1.shape[1]} column(s) are",
+            "identical, they are skipped for the dtype",
+            "alignment and the comparison.",
+        )
+    return identical_columns
+
+
 def handle_different_values(
     dim: str, df_1: pd.DataFrame, df_2: pd.DataFrame
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
@@ -320,17 +516,47 @@ def sort_columns(
     return df_1, df_2
 
 
-def compare(df_1: pd.DataFrame, df_2: pd.DataFrame) -> pd.DataFrame:
+def compare(
+    df_1: pd.DataFrame,
+    df_2: pd.DataFrame,
+    abs_tol: Tolerance = None,
+    rel_tol: Tolerance = None,
+    datetime_tol: DatetimeTolerance = None,
+    equal_columns: Optional[List[int]] = None,
+) -> pd.DataFrame:
+    """Compare if dataframe values are identical, if not, print a
+    summary of the differences. Return the boolean `df_diff`, see
+    `compare_to_result` for details.
+    """
+    return compare_to_result(
+        df_1, df_2, abs_tol, rel_tol, datetime_tol, equal_columns
+    ).df_diff
+
+
+def compare_to_result(
+    df_1: pd.DataFrame,
+    df_2: pd.DataFrame,
+    abs_tol: Tolerance = None,
+    rel_tol: Tolerance = None,
+    datetime_tol: DatetimeTolerance = None,
+    equal_columns: Optional[List[int]] = None,
+) -> DiffResult:
     """Compare if dataframe values are identical, if not, print a
-    summary of the differences.
+    summary of the differences. Return a `DiffResult` object with the
+    cached counts, so they do not have to be recomputed from `df_diff`.
+    Numeric and datetime values within the optional tolerances are
+    treated as identical, and the columns at the positions passed as
+    `equal_columns` are not compared at all, see `DiffResult`.
 
     Note: We do no longer check for identical dtypes in the
     individual columns, but only for identical values. This is because
     NaN values in a longer / wider dataframe can alter dtypes even
     after having been eliminated during previous steps.
     """
-    df_diff = df_1.ne(df_2)
-    if df_diff.sum().sum() == 0:  # TODO
+    result = DiffResult(
+        df_1, df_2, abs_tol, rel_tol, datetime_tol, equal_columns
+    )
+    if result.total == 0:
         print(
             f"\nDataframes successfully compared with shape {df_1.shape}.",
             " They are identical.",
@@ -339,20 +565,138 @@ def compare(df_1: pd.DataFrame, df_2: pd.DataFrame) -> pd.DataFrame:
         print(
             f"\nDataframes successfully compared with shape {df_1.shape}.",
             "They are NOT indentical.",
-            f"\n# of differences per column:\n\n{df_diff.sum()}",
+            f"\n# of differences per column:\n\n{result.column_counts}",
+        )
+    return result
+
+
+def compare_unkeyed(df_1: pd.DataFrame, df_2: pd.DataFrame) -> pd.DataFrame:
+    """Compare the dataframes as multisets of rows, ignoring the index
+    and the row order. Every full row is hashed and the occurences of
+    each hash are counted on both sides, so the run time is linear in
+    the number of rows. Print a summary of the rows that are only found
+    in one of the dataframes (with their multiplicities) and return
+    them as a dataframe with the additional columns `count_df_1` and
+    `count_df_2`. If the row multisets are equal an empty dataframe
+    is returned.
+
+    Note: Values are hashed with their dtypes, so the dtypes should be
+    aligned (see `enforce_dtype_identity`) before calling this function.
+    Columns whose dtypes still differ (e.g. `object` after imputing a
+    missing value on one side only) are hashed as str on both sides.
+    """
+    differing_dtypes = {
+        col: str
+        for col in df_1.columns.intersection(df_2.columns)
+        if df_1[col].dtype != df_2[col].dtype
+    }
+    hashes_1 = pd.util.hash_pandas_object(
+        df_1.astype(differing_dtypes), index=False
+    )
+    hashes_2 = pd.util.hash_pandas_object(
+        df_2.astype(differing_dtypes), index=False
+    )
+    counts = pd.concat(
+        [
+            hashes_1.value_counts().rename("count_df_1"),
+            hashes_2.value_counts().rename("count_df_2"),
+        ],
+        axis=1,
+    )
+    counts = counts.fillna(0).astype(int)
+    counts = counts.loc[counts["count_df_1"] != counts["count_df_2"]]
+
+    if len(counts) == 0:
+        print(
+            "\nDataframes successfully compared as unkeyed rows with",
+            f"shapes {df_1.shape} and {df_2.shape}. They are identical.",
+        )
+        return pd.DataFrame()
+
+    rows = pd.concat(
+        [
+            df_1.set_axis(hashes_1.values, axis=0),
+            df_2.set_axis(hashes_2.values, axis=0),
+        ]
+    )
+    rows = rows.loc[~rows.index.duplicated()]
+    df_rows = rows.loc[counts.index].join(counts)
+    df_rows.index.name = "row_hash"
+
+    surplus_1 = (counts["count_df_1"] - counts["count_df_2"]).clip(lower=0)
+    surplus_2 = (counts["count_df_2"] - counts["count_df_1"]).clip(lower=0)
+    print(
+        "\nDataframes successfully compared as unkeyed rows with",
+        f"shapes {df_1.shape} and {df_2.shape}. They are NOT indentical.",
+    )
+    SUBSETS = [("DF 1", surplus_1), ("DF 2", surplus_2)]
+    for name, surplus in SUBSETS:
+        surplus = surplus.loc[surplus > 0]
+        if len(surplus) > 0:
+            print(
+                f"- {name} has {surplus.sum()} row(s)",
+                f"({len(surplus)} distinct) that could not be found",
+                "in the other DF:",
+            )
+        if len(surplus) <= 30:
+            for row_hash, n in surplus.items():
+                values = tuple(df_rows.loc[row_hash, df_1.columns])
+                print(f"  - {n}x {values}")
+    return df_rows
+
+
+def estimate_difference_rates(
+    result: DiffResult, sample_rate: float, z: float = 1.96
+) -> pd.DataFrame:
+    """Estimate the share of differing values per column from the
+    result of a comparison on sampled dataframes. Print and return a
+    dataframe with the estimated rates, the bounds of their Wilson
+    score intervals (`z` = 1.96 for a confidence level of 95%) and
+    the extrapolated number of differences in the full dataframes.
+    """
+    n = result.shape[0]
+    counts = result.column_counts
+    df_rates = pd.DataFrame({"differences": counts, "compared": n})
+    if n > 0:
+        rate = counts / n
+        denominator = 1 + z ** 2 / n
+        center = (rate + z ** 2 / (2 * n)) / denominator
+        margin = (
+            z
+            * np.sqrt(rate * (1 - rate) / n + z ** 2 / (4 * n ** 2))
+            / denominator
         )
-    return df_diff
+        df_rates["rate"] = rate
+        df_rates["ci_low"] = (center - margin).clip(lower=0)
+        df_rates["ci_high"] = (center + margin).clip(upper=1)
+    else:
+        df_rates["rate"] = df_rates["ci_low"] = df_rates["ci_high"] = np.nan
+    df_rates["estimated_differences"] = (counts / sample_rate).round()
+
+    print(
+        f"\nEstimated difference rates per column from a sample of {n}",
+        f"rows (sample rate {sample_rate}). Run without sampling for the",
+        f"exact result.\n\n{df_rates}",
+    )
+    return df_rates
 
 
-def save_differences_to_xlsx(df_diff: pd.DataFrame) -> None:
+def save_differences_to_xlsx(
+    df_diff: Union[pd.DataFrame, Dict[str, pd.DataFrame]]
+) -> None:
     """Save a boolean dataframe indicating all differences as "True". The
     file is saved to XLSX format with a timestamped file name to the same
-    folder as to where DF_1 was loaded from.
+    folder as to where DF_1 was loaded from. If a dict of dataframes is
+    passed, each of them is saved to the sheet named by its key.
     """
     out_path = Path.cwd()
     out_name = f"compare_df_diff_output_{dt.datetime.strftime(dt.datetime.now(), '%Y-%m-%d-%H-%M-%S')}.xlsx"  # noqa: B950
     full_out_path = out_path / out_name
     writer = pd.ExcelWriter(full_out_path)
-    df_diff.to_excel(writer)
+    if isinstance(df_diff, dict):
+        for sheet_name, df in df_diff.items():
+            df.to_excel(writer, sheet_name=sheet_name)
+    else:
+        df_diff.to_excel(writer)
     writer.save()
     print(f"\nOutput saved to: \n{full_out_path.absolute()}")
@@ -0,0 +1,310 @@
+"""Compare Data From The Command Line
+This is the planning stage. Before the files are loaded, their number
+of rows, width and in-memory footprint are estimated from the file size
+and a parsed prefix, and compared with the available memory and cores
+to choose an execution strategy:
+
+- "in-memory": Load and compare the full files (the default path)
+- "sampled": The full files do not fit into memory. Read CSV files in
+    chunks and keep only a sample of the rows, see `foos.sample_by_key`.
+    As the comparison is not exact anymore, this has to be opted into
+    (see `compare_df.main`)
+- "parallel": Compare the sheets of two workbooks in a process pool,
+    with as many workers as fit into memory
+"""
+
+import io
+import os
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Union
+
+import pandas as pd
+
+from compare_df import foos, streams
+
+PREFIX_BYTES = 4 * 1024 * 1024
+PREFIX_ROWS = 10_000  # For XLSX files
+# Both DFs are held with their imputed copies while comparing
+MEMORY_FACTOR = 3
+# Share of the available memory the comparison may use
+MEMORY_BUDGET = 0.8
+
+
+class FileEstimate(NamedTuple):
+    """Estimated size of a file. The values are None if they can not
+    be estimated (e.g. for stdin).
+    """
+
+    path: str
+    file_size: Optional[int]
+    n_rows: Optional[int]
+    n_cols: Optional[int]
+    memory: Optional[int]
+
+
+class Plan(NamedTuple):
+    """Chosen execution strategy with the estimates it is based on."""
+
+    strategy: str
+    reason: str
+    estimates: List[FileEstimate]
+    required_memory: Optional[int]
+    available_memory: Optional[int]
+    n_cores: int
+    sample_rate: Optional[float] = None
+    max_workers: Optional[int] = None
+
+
+def plan_comparison(
+    path_1: Union[str, Path],
+    path_2: Union[str, Path],
+    load_params_1: Optional[Dict[str, str]] = None,
+    load_params_2: Optional[Dict[str, str]] = None,
+    unkeyed: bool = False,
+    workbook: bool = False,
+) -> Plan:
+    """Estimate the size of both files and choose an execution strategy
+    for the comparison, see module docstring. Nothing is fully loaded.
+    """
+    file_format = foos.indentify_file_format(path_1, path_2)
+    if workbook and file_format != ".xlsx":
+        raise TypeError("Invalid file types. Only .XLSX files allowed.")
+    estimates = [
+        estimate_file(path, file_format, params)
+        for path, params in [(path_1, load_params_1), (path_2, load_params_2)]
+    ]
+    available_memory = get_available_memory()
+    n_cores = os.cpu_count() or 1
+
+    if any(estimate.memory is None for estimate in estimates):
+        required_memory = None
+    else:
+        required_memory = MEMORY_FACTOR * sum(e.memory for e in estimates)
+
+    if workbook:
+        # The estimates are for the first sheet, assumed to be typical
+        max_workers = get_max_workers(required_memory, available_memory)
+        return Plan(
+            "parallel",
+            f"Sheets are compared in a pool of {max_workers} process(es).",
+            estimates,
+            required_memory,
+            available_memory,
+            n_cores,
+            max_workers=max_workers,
+        )
+
+    if required_memory is None or available_memory is None:
+        return Plan(
+            "in-memory",
+            "Memory requirement or availability unknown.",
+            estimates,
+            required_memory,
+            available_memory,
+            n_cores,
+        )
+
+    budget = available_memory * MEMORY_BUDGET
+    if required_memory <= budget:
+        reason = "Estimated memory requirement fits into available memory."
+    elif unkeyed:
+        reason = (
+            "Estimated memory requirement exceeds available memory, "
+            "but sampling is not possible in unkeyed mode."
+        )
+    elif file_format != ".csv":
+        reason = (
+            "Estimated memory requirement exceeds available memory, "
+            "but only CSV files can be read in chunks."
+        )
+    else:
+        sample_rate = float(f"{budget / required_memory:.1g}")
+        return Plan(
+            "sampled",
+            "Estimated memory requirement exceeds available memory, "
+            "CSV files can be read in chunks and sampled.",
+            estimates,
+            required_memory,
+            available_memory,
+            n_cores,
+            sample_rate=max(sample_rate, 1e-6),
+        )
+    return Plan(
+        "in-memory",
+        reason,
+        estimates,
+        required_memory,
+        available_memory,
+        n_cores,
+    )
+
+
+def estimate_file(
+    path: Union[str, Path],
+    file_format: str,
+    load_params: Optional[Dict[str, str]] = None,
+) -> FileEstimate:
+    """Estimate the number of rows, the width and the in-memory size of
+    the data in the file from its size and a parsed prefix.
+    """
+    if str(path) == streams.STDIN:
+        return FileEstimate(str(path), None, None, None, None)
+    params = {} if load_params is None else dict(load_params)
+    file_size = os.path.getsize(path)
+    if file_format == ".csv":
+        return _estimate_csv(path, file_size, params)
+    return _estimate_xlsx(path, file_size, params)
+
+
+def _estimate_csv(
+    path: Union[str, Path], file_size: int, params: Dict
+) -> FileEstimate:
+    """Estimate the size of a (compressed) CSV file, extrapolating from
+    the decompressed prefix. If the prefix can not be parsed, the size
+    is unknown (and the files are compared in memory). This function is
+    called within `estimate_file`.
+    """
+    with open(path, "rb") as raw:
+        compression = streams.detect_compression(raw.peek(8)[:8])
+        source = streams.open_decompressed(raw, compression)
+        prefix = source.read(PREFIX_BYTES)
+        compressed_bytes = raw.tell()
+
+    data_size = file_size
+    if len(prefix) == PREFIX_BYTES:  # Cut off the incomplete last row
+        prefix = prefix[: prefix.rfind(b"\n") + 1]
+        if compression is not None:
+            data_size = int(file_size * len(prefix) / compressed_bytes)
+    elif compression is not None:  # The whole file was decompressed
+        data_size = len(prefix)
+
+    if "sep" not in params and "delimiter" not in params:
+        params["sep"] = foos._detect_separator(
+            io.BufferedReader(io.BytesIO(prefix)), params
+        )
+    try:
+        df = pd.read_csv(io.BytesIO(prefix), **params)
+    except ValueError:  # e.g. the prefix ends in a quoted multiline field
+        return FileEstimate(str(path), file_size, None, None, None)
+    if len(df) == 0:
+        return FileEstimate(str(path), file_size, 0, df.shape[1], 0)
+
+    bytes_per_row = len(prefix) / (len(df) + 1)  # With the header
+    n_rows = max(int(data_size / bytes_per_row) - 1, len(df))
+    memory_per_row = df.memory_usage(deep=True).sum() / len(df)
+    return FileEstimate(
+        str(path),
+        file_size,
+        n_rows,
+        df.shape[1],
+        int(memory_per_row * n_rows),
+    )
+
+
+def _estimate_xlsx(
+    path: Union[str, Path], file_size: int, params: Dict
+) -> FileEstimate:
+    """Estimate the size of the sheet that will be compared from the
+    dimensions stored in the workbook and a parsed prefix. This
+    function is called within `estimate_file`.
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    try:
+        sheet_name = params.get("sheet_name", 0)
+        if isinstance(sheet_name, int):
+            sheet = workbook.worksheets[sheet_name]
+        else:
+            sheet = workbook[sheet_name]
+        n_rows, n_cols = sheet.max_row, sheet.max_column
+    finally:
+        workbook.close()
+    if n_rows is None:  # Dimensions not stored by the writer
+        return FileEstimate(str(path), file_size, None, n_cols, None)
+
+    n_rows = max(n_rows - 1, 0)  # Without the header
+    if params.get("engine") is None:
+        params["engine"] = "openpyxl"
+    params["nrows"] = min(n_rows, PREFIX_ROWS)
+    df = pd.read_excel(path, **params)
+    if len(df) == 0:
+        return FileEstimate(str(path), file_size, n_rows, df.shape[1], 0)
+    memory_per_row = df.memory_usage(deep=True).sum() / len(df)
+    return FileEstimate(
+        str(path),
+        file_size,
+        n_rows,
+        df.shape[1],
+        int(memory_per_row * n_rows),
+    )
+
+
+def get_max_workers(
+    required_memory: Optional[int], available_memory: Optional[int] = None
+) -> int:
+    """Return the number of worker processes that fit into the available
+    memory if each of them requires `required_memory` (at most one per
+    core). If either is unknown, one per core is returned.
+    """
+    n_cores = os.cpu_count() or 1
+    if available_memory is None:
+        available_memory = get_available_memory()
+    if not required_memory or available_memory is None:
+        return n_cores
+    budget = int(available_memory * MEMORY_BUDGET)
+    return max(1, min(n_cores, budget // required_memory))
+
+
+def get_available_memory() -> Optional[int]:
+    """Return the available memory in bytes, or None if it can not be
+    determined on this platform.
+    """
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def print_plan(plan: Plan) -> None:
+    """Print the estimates and the chosen execution strategy."""
+    print("\nExecution plan:")
+    for estimate in plan.estimates:
+        print(
+            f"- {estimate.path}: {_format_bytes(estimate.file_size)} on disk,",
+            f"~{_format_count(estimate.n_rows)} rows x",
+            f"{_format_count(estimate.n_cols)} columns,",
+            f"~{_format_bytes(estimate.memory)} in memory",
+        )
+    print(
+        f"- Required memory: ~{_format_bytes(plan.required_memory)},",
+        f"available memory: {_format_bytes(plan.available_memory)},",
+        f"cores: {plan.n_cores}",
+    )
+    print(f"- Strategy: {plan.strategy}. {plan.reason}")
+    if plan.sample_rate is not None:
+        print(f"- Sample rate: {plan.sample_rate}")
+
+
+def _format_bytes(n_bytes: Optional[int]) -> str:
+    """Return the number of bytes in a human readable format."""
+    if n_bytes is None:
+        return "unknown"
+    size = float(n_bytes)
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def _format_count(count: Optional[int]) -> str:
+    """Return the count with thousands separators, or "unknown"."""
+    return "unknown" if count is None else f"{count:,}"
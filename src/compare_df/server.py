@@ -0,0 +1,189 @@
+"""Compare Data From The Command Line
+This is the resident server version. It keeps Pandas imported and the
+most recently used baselines (DF_1) loaded in memory between requests,
+so that repeated comparisons against the same baseline only have to
+load the second file.
+
+Usage:
+------
+    $ compare_df --serve [--host HOST] [--port PORT]
+
+Requests are sent with the thin client, see `compare_df.client`. The
+server does not authenticate its clients and reads any file it is asked
+for, so it only listens on loopback addresses.
+"""
+
+import contextlib
+import io
+import ipaddress
+import json
+import os
+import socket
+import socketserver
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+from compare_df import foos
+from compare_df.__main__ import main
+from compare_df.client import DEFAULT_HOST, DEFAULT_PORT
+
+MAX_BASELINES = 8
+
+
+class BaselineCache:
+    """LRU cache of loaded baselines, keyed by the absolute path and
+    the load params. A baseline is reloaded if its file was modified
+    after it was loaded.
+    """
+
+    def __init__(self, max_baselines: int = MAX_BASELINES) -> None:
+        self.max_baselines = max_baselines
+        self._baselines: Dict[Hashable, Tuple[float, pd.DataFrame]]
+        self._baselines = OrderedDict()
+
+    def get(
+        self,
+        path: str,
+        file_format: str,
+        load_params: Optional[Dict[str, str]] = None,
+    ) -> pd.DataFrame:
+        """Return the baseline for the passed path and load params,
+        load it if it is not cached or outdated.
+        """
+        key = (
+            str(Path(path).resolve()),
+            json.dumps(load_params, sort_keys=True),
+        )
+        mtime = os.path.getmtime(path)
+        if key in self._baselines and self._baselines[key][0] == mtime:
+            self._baselines.move_to_end(key)
+            df = self._baselines[key][1]
+            print(f"- DF taken from cache, with original shape of {df.shape}")
+            return df
+
+        df = foos.load_file(
+            path, file_format, load_params, interactive=False
+        )
+        self._baselines[key] = (mtime, df)
+        self._baselines.move_to_end(key)
+        while len(self._baselines) > self.max_baselines:
+            self._baselines.popitem(last=False)
+        return df
+
+
+class ComparisonHandler(socketserver.StreamRequestHandler):
+    """Handle one request per connection: Read a JSON line with the
+    paths and load params, run the comparison non-interactively and
+    answer with a JSON line containing the captured summary and the
+    differences (or an error message).
+    """
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline().decode("utf-8"))
+            response = run_request(request, self.server.baselines)
+        except (Exception, SystemExit) as e:
+            response = {"error": f"{type(e).__name__}: {e}"}
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class ComparisonServer(socketserver.TCPServer):
+    """TCP server that handles the requests one after the other and
+    owns the baseline cache.
+    """
+
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        max_baselines: int = MAX_BASELINES,
+    ) -> None:
+        super().__init__(address, ComparisonHandler)
+        self.baselines = BaselineCache(max_baselines)
+
+
+def run_request(request: Dict[str, Any], baselines: BaselineCache) -> Dict:
+    """Run the full comparison process for a request and return the
+    response dict with the captured standard-out report as `summary`.
+    If the request asks for `rows`, the differences are added as
+    `columns` and `rows` (all values as str).
+    """
+    path_1, path_2 = request["path_1"], request["path_2"]
+    unkeyed = request.get("unkeyed", False)
+    sample_rate = request.get("sample_rate")
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        file_format = foos.indentify_file_format(path_1, path_2)
+        df_1 = baselines.get(
+            path_1, file_format, request.get("load_params_1")
+        )
+        df_2 = foos.load_file(
+            path_2,
+            file_format,
+            request.get("load_params_2"),
+            interactive=False,
+            sample_rate=sample_rate,
+        )
+        result, _, _ = main(
+            df_1,
+            df_2,
+            unkeyed=unkeyed,
+            return_result=True,
+            interactive=False,
+            sample_rate=sample_rate,
+            abs_tol=request.get("abs_tol"),
+            rel_tol=request.get("rel_tol"),
+            datetime_tol=request.get("datetime_tol"),
+        )
+
+    response = {"summary": buffer.getvalue()}
+    if not request.get("rows", False):
+        return response
+    if unkeyed:
+        columns = ["row_hash"] + [str(col) for col in result.columns]
+        rows = [
+            [str(value) for value in row]
+            for row in result.reset_index().itertuples(index=False)
+        ]
+    else:
+        columns = ["index", "column", "value_df_1", "value_df_2"]
+        rows = [
+            [str(value) for value in row] for row in result.iter_differences()
+        ]
+    response.update({"columns": columns, "rows": rows})
+    return response
+
+
+def is_loopback(host: str) -> bool:
+    """Check if the host name or address resolves to a loopback
+    address.
+    """
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (OSError, ValueError):
+        return False
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    max_baselines: int = MAX_BASELINES,
+) -> None:
+    """Start the comparison server and handle requests until
+    interrupted. Only loopback hosts are accepted, see module docstring.
+    """
+    if not is_loopback(host):
+        raise ValueError(
+            f"Invalid host {host}. The server has no authentication and "
+            "only listens on loopback addresses (e.g. 127.0.0.1)."
+        )
+    with ComparisonServer((host, port), max_baselines) as server:
+        print(f"Comparison server listening on {host}:{port}.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nComparison server stopped.")
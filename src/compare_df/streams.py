@@ -0,0 +1,165 @@
+import bz2
+import gzip
+import io
+import lzma
+import queue
+import sys
+import threading
+from pathlib import Path
+from typing import BinaryIO, Optional, Sequence, Union
+
+STDIN = "-"
+CHUNK_SIZE = 1024 * 1024
+QUEUE_SIZE = 16
+MAGIC_BYTES = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+COMPRESSION_SUFFIXES = [".gz", ".bz2", ".xz", ".zst"]
+
+
+class ThreadedReader(io.RawIOBase):
+    """Read a binary stream in a background thread. The chunks are
+    passed through a bounded queue, so that reading (and decompressing)
+    the next chunks overlaps with parsing the current one.
+    """
+
+    def __init__(
+        self,
+        source: BinaryIO,
+        chunk_size: int = CHUNK_SIZE,
+        queue_size: int = QUEUE_SIZE,
+        to_close: Sequence[BinaryIO] = (),
+    ) -> None:
+        super().__init__()
+        self._source = source
+        self._chunk_size = chunk_size
+        self._to_close = to_close
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._chunk = memoryview(b"")
+        self._exhausted = False
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+        self._thread.start()
+
+    def _produce(self) -> None:
+        """Put the chunks read from the source on the queue, followed
+        by an empty chunk (or the raised exception) to signal the end.
+        """
+        try:
+            while not self._stopped.is_set():
+                chunk = self._source.read(self._chunk_size)
+                self._queue.put(chunk)
+                if not chunk:
+                    break
+        except Exception as e:
+            self._queue.put(e)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if len(self._chunk) == 0:
+            if self._exhausted:
+                return 0
+            item = self._queue.get()
+            if isinstance(item, Exception):
+                self._exhausted = True
+                raise item
+            if not item:
+                self._exhausted = True
+                return 0
+            self._chunk = memoryview(item)
+        n = min(len(buffer), len(self._chunk))
+        buffer[:n] = self._chunk[:n]
+        self._chunk = self._chunk[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stopped.set()
+            # Unblock the producer if it is waiting for a free slot
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            for f in self._to_close:
+                f.close()
+        super().close()
+
+
+def strip_compression_suffix(path: Union[str, Path]) -> str:
+    """Return the file format suffix of the path, ignoring a trailing
+    compression suffix (e.g. ".csv" for "data.csv.gz"). Stdin ("-")
+    is always expected to be CSV.
+    """
+    if str(path) == STDIN:
+        return ".csv"
+    suffixes = Path(path).suffixes
+    if len(suffixes) > 0 and suffixes[-1] in COMPRESSION_SUFFIXES:
+        suffixes = suffixes[:-1]
+    return suffixes[-1] if len(suffixes) > 0 else ""
+
+
+def detect_compression(header: bytes) -> Optional[str]:
+    """Return the name of the compression format indicated by the magic
+    bytes at the start of the file, or None if it is not compressed.
+    """
+    for magic, compression in MAGIC_BYTES.items():
+        if header.startswith(magic):
+            return compression
+    return None
+
+
+def open_decompressed(raw: BinaryIO, compression: Optional[str]) -> BinaryIO:
+    """Wrap the raw binary stream into a decompressing reader for the
+    passed compression format, see `detect_compression`. If it is None,
+    the raw stream is returned.
+    """
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=raw)
+    elif compression == "bz2":
+        return bz2.BZ2File(raw)
+    elif compression == "xz":
+        return lzma.LZMAFile(raw)
+    elif compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(
+                "Reading zstd compressed files requires the `zstandard` "
+                "package. Install it with `pip install zstandard`, please."
+            )
+        return zstandard.ZstdDecompressor().stream_reader(raw)
+    return raw
+
+
+def open_csv_source(path: Union[str, Path]) -> Union[str, Path, BinaryIO]:
+    """Return the path itself for an uncompressed file. For stdin ("-")
+    or a compressed file (detected from the magic bytes) return a
+    binary stream that is read and decompressed in a background thread,
+    to be passed to `pd.read_csv()`. An uncompressed file with a
+    compression suffix is returned as a stream as well, so that Pandas
+    does not infer the compression from the suffix. The stream has to
+    be closed by the caller.
+    """
+    if str(path) == STDIN:
+        raw = sys.stdin.buffer
+    else:
+        raw = open(path, "rb")
+    compression = detect_compression(raw.peek(8)[:8])
+    if (
+        compression is None
+        and str(path) != STDIN
+        and Path(path).suffix not in COMPRESSION_SUFFIXES
+    ):
+        raw.close()
+        return path
+
+    source = open_decompressed(raw, compression)
+    to_close = [] if source is raw else [source]
+    if str(path) != STDIN:
+        to_close.append(raw)
+    return io.BufferedReader(
+        ThreadedReader(source, to_close=to_close), buffer_size=CHUNK_SIZE
+    )
@@ -0,0 +1,184 @@
+"""Compare Data From The Command Line
+This is the workbook version, comparing all sheets of two XLSX files.
+
+Usage:
+------
+    >>> from compare_df.workbook import compare_workbooks
+    >>> df_report, diffs = compare_workbooks('path_1', 'path_2')
+
+Each file is opened and parsed only once, the sheets are paired by
+name and the per-sheet comparisons run concurrently in a process pool.
+"""
+
+import contextlib
+import io
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import pandas as pd
+
+from compare_df import foos, planner
+from compare_df.__main__ import main
+from compare_df.diff_result import DatetimeTolerance, Tolerance
+
+
+def compare_workbooks(
+    path_1: Union[str, Path],
+    path_2: Union[str, Path],
+    load_params_1: Optional[Dict[str, str]] = None,
+    load_params_2: Optional[Dict[str, str]] = None,
+    max_workers: Optional[int] = None,
+    interactive: bool = True,
+    unkeyed: bool = False,
+    sample_rate: Optional[float] = None,
+    abs_tol: Tolerance = None,
+    rel_tol: Tolerance = None,
+    datetime_tol: DatetimeTolerance = None,
+    strategy: str = "auto",
+) -> Tuple[pd.DataFrame, Dict[str, pd.DataFrame]]:
+    """Run the full comparison process for each pair of sheets with the
+    same name in two XLSX files. Print the report of each comparison and
+    a consolidated summary. Offer the option to save all differences to
+    one XLSX file, with a sheet per differing pair.
+
+    Args:
+        path_1: Path to the first XLSX file.
+        path_2: Path to the second XLSX file.
+        load_params_1: Dict of key-value pairs in string format, to be
+            passed to `pd.read_excel` for all sheets of the first file
+            (`sheet_name` is not allowed). Defaults to None.
+        load_params_2: Same as `load_params_1` for the second file.
+        max_workers: Max number of processes for the comparisons,
+            defaults to None (as many as fit into memory if `strategy` is
+            "auto", else the number of processors).
+        interactive: If False, the output file is not saved, see `main`.
+            The per-sheet comparisons are always run non-interactively.
+            Defaults to True.
+        unkeyed: See `main`. Defaults to False.
+        sample_rate: See `main`. Defaults to None.
+        abs_tol, rel_tol, datetime_tol: Tolerances, see `main`.
+            Defaults to None.
+        strategy: If "auto" and no `max_workers` are passed, the number
+            of processes is planned from the memory usage of the largest
+            pair of parsed sheets. With "in-memory" one process per core
+            is used. Defaults to "auto".
+
+    Returns:
+        df_report: Dataframe with one row per sheet name, indicating the
+            status of the comparison and the number of differences.
+        diffs: Dict with the `df_diff` (see `main`) of each differing
+            pair of sheets.
+    """
+    if strategy not in ["auto", "in-memory"]:
+        raise ValueError(
+            "Invalid strategy. Use 'auto' or 'in-memory', sheets can not "
+            "be sampled while reading."
+        )
+    if foos.indentify_file_format(path_1, path_2) != ".xlsx":
+        raise TypeError("Invalid file types. Only .XLSX files allowed.")
+    for load_params in [load_params_1, load_params_2]:
+        if load_params is not None and "sheet_name" in load_params:
+            raise ValueError(
+                "Invalid load param `sheet_name`. All sheets are compared "
+                "in workbook mode."
+            )
+
+    with ProcessPoolExecutor(2) as executor:
+        sheets_1, sheets_2 = executor.map(
+            _read_sheets, [path_1, path_2], [load_params_1, load_params_2]
+        )
+    print(f"- DF 1 loaded, with {len(sheets_1)} sheet(s)")
+    print(f"- DF 2 loaded, with {len(sheets_2)} sheet(s)")
+    names = [name for name in sheets_1 if name in sheets_2]
+
+    if strategy == "auto" and max_workers is None and len(names) > 0:
+        # Memory needed to compare the largest pair of sheets
+        required_memory = planner.MEMORY_FACTOR * max(
+            sheets_1[name].memory_usage(deep=True).sum()
+            + sheets_2[name].memory_usage(deep=True).sum()
+            for name in names
+        )
+        max_workers = planner.get_max_workers(int(required_memory))
+        print(f"- Sheets are compared in a pool of {max_workers} process(es)")
+
+    with ProcessPoolExecutor(max_workers) as executor:
+        main_kwargs = {
+            "unkeyed": unkeyed,
+            "sample_rate": sample_rate,
+            "abs_tol": abs_tol,
+            "rel_tol": rel_tol,
+            "datetime_tol": datetime_tol,
+        }
+        futures = {
+            name: executor.submit(
+                _compare_sheets, sheets_1[name], sheets_2[name], main_kwargs
+            )
+            for name in names
+        }
+
+        report = []
+        diffs = {}
+        for name, future in futures.items():
+            summary, n_differences, df_diff = future.result()
+            print(f"\n=== Sheet '{name}' ===\n{summary}", end="")
+            status = "different" if n_differences > 0 else "identical"
+            report.append((name, status, n_differences))
+            if n_differences > 0:
+                diffs[name] = df_diff
+
+    for name, sheets, other in [
+        ("DF 1", sheets_1, sheets_2),
+        ("DF 2", sheets_2, sheets_1),
+    ]:
+        for sheet_name in sheets:
+            if sheet_name not in other:
+                report.append((sheet_name, f"only in {name}", 0))
+
+    df_report = pd.DataFrame(
+        report, columns=["sheet", "status", "differences"]
+    ).set_index("sheet")
+    print(f"\n=== Summary ===\n\n{df_report}")
+
+    if len(diffs) > 0:
+        user_input = foos.get_user_input("output", interactive)
+        if user_input == "y":
+            foos.save_differences_to_xlsx(diffs)
+
+    return df_report, diffs
+
+
+def _read_sheets(
+    path: Union[str, Path], load_params: Optional[Dict[str, str]] = None
+) -> Dict[str, pd.DataFrame]:
+    """Open the XLSX file once and parse all of its sheets. This
+    function is called within `compare_workbooks`.
+    """
+    params = {} if load_params is None else dict(load_params)
+    if params.get("engine") is None:
+        params["engine"] = "openpyxl"
+    params["sheet_name"] = None
+    return pd.read_excel(path, **params)
+
+
+def _compare_sheets(
+    df_1: pd.DataFrame, df_2: pd.DataFrame, main_kwargs: Dict[str, Any]
+) -> Tuple[str, int, pd.DataFrame]:
+    """Run `main` non-interactively on one pair of sheets in a worker
+    process, with the passed keyword arguments. Return the captured
+    report, the number of differences and the `df_diff`. This function
+    is called within `compare_workbooks`.
+    """
+    unkeyed = main_kwargs["unkeyed"]
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        result, _, _ = main(
+            df_1,
+            df_2,
+            return_result=not unkeyed,
+            interactive=False,
+            **main_kwargs,
+        )
+    if unkeyed:
+        return buffer.getvalue(), len(result), result
+    return buffer.getvalue(), result.total, result.df_diff
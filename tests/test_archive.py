@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+from compare_df import foos
+from compare_df.__main__ import main
+from compare_df.diff_result import DiffResult
+
+from compare_df import archive
+
+try:
+    archive._import_pyarrow()
+except ImportError:
+    pytest.skip("pyarrow is not available", allow_module_level=True)
+
+
+def test_write_and_query_archive(tmp_path, df_1_base, df_2_base):
+    df_1, df_2 = foos.impute_missing_values(df_1_base, df_2_base)
+    path = tmp_path / "diff.parquet"
+    archive.write_archive(
+        DiffResult(df_1, df_2), path, {"inputs": ["a", "b"]}, 1
+    )
+    metadata = archive.read_archive_metadata(path)
+    assert metadata["inputs"] == ["a", "b"]
+    assert metadata["total"] == 3
+    assert metadata["column_counts"]["int_2"] == 1
+
+    df = archive.query_archive(path)
+    assert list(df.columns) == archive.COLUMNS
+    assert list(df["key"]) == ["0", "1", "1"]
+    df = archive.query_archive(path, keys=[1], columns=["float_5"])
+    assert df.values.tolist() == [["1", "float_5", "0.03", "0.034"]]
+    assert len(archive.query_archive(path, keys=["9"])) == 0
+
+
+def test_main_archive(tmp_path):
+    df = pd.DataFrame({"a": [1, 2]})
+    path = tmp_path / "diff.parquet"
+    main(df, df.copy(), interactive=False, archive_path=path)
+    assert archive.read_archive_metadata(path)["shape"] == [2, 1]
+    assert len(archive.query_archive(path)) == 0
+    with pytest.raises(ValueError):
+        main(df, df, unkeyed=True, interactive=False, archive_path=path)
+
+
+def test_write_archive_multiindex(tmp_path):
+    index = pd.MultiIndex.from_tuples([(1, "a"), (1, "b"), (2, "a")])
+    df_1 = pd.DataFrame({"x": [1, 2, 3]}, index=index)
+    df_2 = pd.DataFrame({"x": [1, 5, 3]}, index=index)
+    path = tmp_path / "diff.parquet"
+    archive.write_archive(DiffResult(df_1, df_2), path)
+    df = archive.query_archive(path, keys=[(1, "b")])
+    assert df.values.tolist() == [["(1, 'b')", "x", "2", "5"]]
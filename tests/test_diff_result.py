@@ -0,0 +1,109 @@
+import pandas as pd
+
+from compare_df import foos
+from compare_df.diff_result import DiffResult
+
+
+def test_diff_result_counts(df_1_base, df_2_base):
+    df_1, df_2 = foos.impute_missing_values(df_1_base, df_2_base)
+    result = DiffResult(df_1, df_2)
+    assert result.total == 3
+    assert result.column_counts.to_dict() == {
+        "date_1": 0,
+        "int_2": 1,
+        "str_3": 0,
+        "float_4": 0,
+        "float_5": 1,
+        "string_6": 1,
+    }
+    assert list(result.row_counts) == [1, 2]
+    assert result.df_diff.equals(df_1.ne(df_2))
+
+
+def test_diff_result_iter_differences(df_1_base, df_2_base):
+    df_1, df_2 = foos.impute_missing_values(df_1_base, df_2_base)
+    result = DiffResult(df_1, df_2)
+    differences = list(result.iter_differences())
+    assert differences[0] == (1, "int_2", 1, "MISSING")
+    assert [(idx, col) for idx, col, _, _ in differences] == [
+        (1, "int_2"),
+        (1, "float_5"),
+        (0, "string_6"),
+    ]
+    examples = result.examples(2)
+    assert list(examples["column"]) == ["int_2", "float_5"]
+    assert result.examples(2) is examples
+
+
+def test_diff_result_empty():
+    result = DiffResult(pd.DataFrame(), pd.DataFrame())
+    assert result.total == 0
+    assert result.df_diff.empty
+
+
+def test_diff_result_tolerances():
+    df_1 = pd.DataFrame(
+        {
+            "float": [0.03, 1.0, 100.0],
+            "int": [1, 2, 3],
+            "date": pd.to_datetime(["2020-01-01"] * 3),
+            "str": ["a", "b", "c"],
+        }
+    )
+    df_2 = pd.DataFrame(
+        {
+            "float": [0.030000000000000002, 1.1, 101.0],
+            "int": [1, 2, 4],
+            "date": pd.to_datetime(["2020-01-01 00:00:01"] * 3),
+            "str": ["a", "b", "d"],
+        }
+    )
+    assert DiffResult(df_1, df_2).total == 8
+
+    result = DiffResult(df_1, df_2, abs_tol=1e-9, datetime_tol="1s")
+    assert result.column_counts.to_dict() == {
+        "float": 2,
+        "int": 1,
+        "date": 0,
+        "str": 1,
+    }
+    assert result.df_diff["float"].tolist() == [False, True, True]
+
+    result = DiffResult(df_1, df_2, abs_tol={"float": 1e-9}, rel_tol=0.02)
+    assert result.column_counts.to_dict() == {
+        "float": 1,
+        "int": 1,
+        "date": 3,
+        "str": 1,
+    }
+
+
+def test_diff_result_tolerances_large_integers():
+    df_1 = pd.DataFrame({"id": [123456789012345678, 2**63 - 1]})
+    df_2 = pd.DataFrame({"id": [123456789012345679, -(2**63)]})
+    assert DiffResult(df_1, df_2).total == 2
+    assert DiffResult(df_1, df_2, abs_tol=1e-9).total == 2
+    assert DiffResult(df_1, df_2, abs_tol=1).column_counts["id"] == 1
+
+
+def test_diff_result_iter_difference_frames(df_1_base, df_2_base):
+    df_1, df_2 = foos.impute_missing_values(df_1_base, df_2_base)
+    result = DiffResult(df_1, df_2)
+    frames = list(result.iter_difference_frames(n_rows=1))
+    assert len(frames) == 2
+    assert list(frames[0]["column"]) == ["string_6"]
+    assert list(frames[1]["column"]) == ["int_2", "float_5"]
+    frames = list(result.iter_difference_frames(positions=[1, 0]))
+    assert list(frames[0]["index"]) == [1, 1, 0]
+
+
+def test_diff_result_mixed_tolerance_and_block_columns():
+    df_1 = pd.DataFrame({"a": [1.0, 2.0], "b": [1.0, 2.0], "c": ["x", "y"]})
+    df_2 = pd.DataFrame({"a": [1.05, 2.0], "b": [1.05, 2.0], "c": ["x", "z"]})
+    result = DiffResult(df_1, df_2, abs_tol={"a": 0.1}, equal_columns=[2])
+    assert result.column_counts.to_dict() == {"a": 0, "b": 1, "c": 0}
+    assert list(result.row_counts) == [1, 0]
+    assert result.df_diff.values.tolist() == [
+        [False, True, False],
+        [False, False, False],
+    ]
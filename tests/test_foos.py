@@ -35,6 +35,8 @@ def test_indentify_file_format(path_1, path_2, expected):
 def test_indentify_file_format_raise():
     with pytest.raises(AssertionError):
         foos.indentify_file_format("df.xlsx", "df.csv")
+    with pytest.raises(ValueError):
+        foos.indentify_file_format("-", "-")
 
 
 def test_load_csv():
@@ -154,6 +156,8 @@ def test_get_user_input(monkeypatch):
     monkeypatch.setattr("builtins.input", lambda _: "y")
     user_input = foos.get_user_input("columns")
     assert user_input == "y"
+    user_input = foos.get_user_input("output", interactive=False)
+    assert user_input == "n"
 
 
 def test_enforce_column_identity(df_1_base, df_2_base):
@@ -186,6 +190,33 @@ def test_enforce_dtype_identity(df_1_base, df_2_base, capsys):
     assert "float_4" in captured.out
 
 
+def test_find_identical_columns(df_1_base, df_2_base, capsys):
+    df_1, df_2 = foos.impute_missing_values(df_1_base, df_2_base)
+    identical_columns = foos.find_identical_columns(df_1, df_2)
+    assert identical_columns == [0, 2, 3]
+    captured = capsys.readouterr()
+    assert "3 of 6 column(s) are identical" in captured.out
+    assert foos.find_identical_columns(df_1, df_2.iloc[::-1]) == []
+
+
+def test_find_identical_columns_int_vs_str():
+    df_1 = pd.DataFrame({"a": [1, "x"]}, dtype=object)
+    df_2 = pd.DataFrame({"a": ["1", "x"]}, dtype=object)
+    identical_columns = foos.find_identical_columns(df_1, df_2)
+    assert identical_columns == []
+    result = foos.compare_to_result(
+        df_1, df_2, equal_columns=identical_columns
+    )
+    assert result.total == 1
+
+
+def test_enforce_dtype_identity_skip_columns(df_1_base):
+    df_2 = df_1_base.copy()
+    df_2["float_4"] = df_2["float_4"].astype(int)
+    _, df_2 = foos.enforce_dtype_identity(df_1_base, df_2, skip_columns=[3])
+    assert df_2["float_4"].dtype == int
+
+
 def test_get_subsets(df_1_base, df_1_extended):
     only_1, only_2 = foos._get_subsets("index", df_1_base, df_1_extended)
     assert (only_1 == set()) and (only_2 == set([2]))
@@ -224,6 +255,59 @@ def test_compare(df_1_base, df_2_base, capsys):
     assert "They are NOT indentical." in captured.out
     assert df_diff.sum().sum() > 0
 
+    df_diff = foos.compare(df_1, df_2, equal_columns=[1, 4, 5])
+    assert df_diff.sum().sum() == 0
+
+
+def test_compare_unkeyed(df_1_base, df_2_base, capsys):
+    df_1, df_2 = foos.impute_missing_values(df_1_base, df_2_base)
+    df_rows = foos.compare_unkeyed(df_1, df_1.iloc[::-1])
+    captured = capsys.readouterr()
+    assert "They are identical" in captured.out
+    assert df_rows.empty
+
+    df_3 = df_1.iloc[[1, 0, 0]].reset_index(drop=True)
+    df_rows = foos.compare_unkeyed(df_1, df_3)
+    captured = capsys.readouterr()
+    assert "They are NOT indentical." in captured.out
+    assert "DF 2 has 1 row(s) (1 distinct)" in captured.out
+    assert list(df_rows["str_3"]) == ["row1"]
+    assert list(df_rows["count_df_1"]) == [1]
+    assert list(df_rows["count_df_2"]) == [2]
+
+
+def test_compare_unkeyed_missing_value_on_one_side(capsys):
+    df_1 = pd.DataFrame({"k": [1, 2, 3], "x": [0.5, 1.5, 2.5]})
+    df_2 = pd.DataFrame({"k": [3, 2, 1], "x": [2.5, 1.5, np.nan]})
+    df_1, df_2 = foos.impute_missing_values(df_1, df_2)
+    df_rows = foos.compare_unkeyed(df_1, df_2)
+    captured = capsys.readouterr()
+    assert "DF 1 has 1 row(s) (1 distinct)" in captured.out
+    assert "DF 2 has 1 row(s) (1 distinct)" in captured.out
+    assert len(df_rows) == 2
+
+
+def test_sample_by_key(df_1_extended):
+    df = pd.concat([df_1_extended] * 100, ignore_index=True)
+    df_sample = foos.sample_by_key(df, 0.2)
+    assert 0 < len(df_sample) < len(df) / 2
+    assert df_sample.equals(foos.sample_by_key(df.iloc[::-1], 0.2).iloc[::-1])
+    assert foos.sample_by_key(df, 1).equals(df)
+    with pytest.raises(ValueError):
+        foos.sample_by_key(df, 0)
+
+
+def test_estimate_difference_rates(df_1_base, df_2_base, capsys):
+    df_1, df_2 = foos.impute_missing_values(df_1_base, df_2_base)
+    result = foos.compare_to_result(df_1, df_2)
+    df_rates = foos.estimate_difference_rates(result, 0.5)
+    captured = capsys.readouterr()
+    assert "Estimated difference rates" in captured.out
+    assert df_rates.loc["int_2", "rate"] == 0.5
+    assert df_rates.loc["int_2", "estimated_differences"] == 2
+    assert (df_rates["ci_low"] <= df_rates["rate"]).all()
+    assert (df_rates["rate"] <= df_rates["ci_high"]).all()
+
 
 # def test_main(capsys):
 #     main("tests/df_1_file.csv", "tests/df_1_file.csv", None)
@@ -250,3 +334,13 @@ def test_compare(df_1_base, df_2_base, capsys):
 #     ) as e:
 #         main("tests/df_1_file.csv", "tests/df_1_alt_col_file.csv", None)
 #         assert e.type is ValueError
+
+
+def test_check_for_tolerances_on_missing_values(df_1_base, df_2_base, capsys):
+    columns = foos.check_for_tolerances_on_missing_values(
+        df_1_base, df_2_base, abs_tol=0.1
+    )
+    assert columns == ["int_2", "float_5"]
+    assert "WARNING" in capsys.readouterr().out
+    columns = foos.check_for_tolerances_on_missing_values(df_1_base, df_2_base)
+    assert columns == []
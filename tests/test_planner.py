@@ -0,0 +1,78 @@
+import gzip
+
+import pandas as pd
+import pytest
+
+from compare_df import planner
+from compare_df.__main__ import main
+
+
+def test_estimate_file(tmp_path):
+    df = pd.DataFrame({"a": range(1000), "b": ["text"] * 1000})
+    path = tmp_path / "df.csv"
+    df.to_csv(path, index=False)
+    estimate = planner.estimate_file(path, ".csv")
+    assert estimate.n_rows == 1000
+    assert estimate.n_cols == 2
+    assert estimate.memory > 0
+
+    path_gz = tmp_path / "df.csv.gz"
+    path_gz.write_bytes(gzip.compress(path.read_bytes()))
+    assert planner.estimate_file(path_gz, ".csv").n_rows == 1000
+    assert planner.estimate_file("-", ".csv").n_rows is None
+
+
+def test_plan_comparison(df_1_base, tmp_path, monkeypatch, capsys):
+    path = tmp_path / "df.csv"
+    df_1_base.to_csv(path, index=False)
+    plan = planner.plan_comparison(path, path)
+    assert plan.strategy == "in-memory"
+
+    monkeypatch.setattr(planner, "get_available_memory", lambda: 100)
+    plan = planner.plan_comparison(path, path)
+    assert plan.strategy == "sampled"
+    assert 0 < plan.sample_rate < 1
+    plan = planner.plan_comparison(path, path, unkeyed=True)
+    assert plan.strategy == "in-memory"
+
+    planner.print_plan(plan)
+    captured = capsys.readouterr()
+    assert "Strategy: in-memory" in captured.out
+
+
+def test_main_requires_opt_in_for_sampling(df_1_base, tmp_path, monkeypatch):
+    path = tmp_path / "df.csv"
+    df_1_base.to_csv(path, index=False)
+    monkeypatch.setattr(planner, "get_available_memory", lambda: 100)
+    with pytest.raises(SystemExit):
+        main(path, path, interactive=False)
+    _, df_1, _ = main(path, path, interactive=False, strategy="sampled")
+    assert len(df_1) < len(df_1_base)
+    _, df_1, _ = main(path, path, interactive=False, strategy="in-memory")
+    assert len(df_1) == len(df_1_base)
+
+
+def test_main_sampled_identical_reports_rates(capsys):
+    df = pd.DataFrame({"a": range(1000)})
+    main(df, df.copy(), interactive=False, sample_rate=0.1)
+    captured = capsys.readouterr()
+    assert "the sampled DFs are identical" in captured.out
+    assert "Estimated difference rates" in captured.out
+
+
+def test_estimate_file_unparsable_prefix(tmp_path, monkeypatch):
+    path = tmp_path / "df.csv"
+    row = 'a,"multi\nline"\n'
+    path.write_text("x,y\n" + row * 20)
+    # The prefix is cut after the line break inside the 6th quoted field
+    monkeypatch.setattr(planner, "PREFIX_BYTES", 4 + len(row) * 5 + 10)
+    estimate = planner.estimate_file(path, ".csv")
+    assert estimate.memory is None
+    assert planner.plan_comparison(path, path).strategy == "in-memory"
+
+
+def test_plan_comparison_workbook_requires_xlsx(df_1_base, tmp_path):
+    path = tmp_path / "df.csv"
+    df_1_base.to_csv(path, index=False)
+    with pytest.raises(TypeError):
+        planner.plan_comparison(path, path, workbook=True)
@@ -0,0 +1,36 @@
+from compare_df.server import BaselineCache, is_loopback, run_request
+
+
+def test_baseline_cache(df_1_base, tmp_path, capsys):
+    paths = []
+    for i in range(3):
+        paths.append(str(tmp_path / f"df_{i}.csv"))
+        df_1_base.to_csv(paths[-1], index=False)
+    baselines = BaselineCache(max_baselines=2)
+    df = baselines.get(paths[0], ".csv")
+    assert baselines.get(paths[0], ".csv") is df
+    captured = capsys.readouterr()
+    assert "taken from cache" in captured.out
+    baselines.get(paths[1], ".csv")
+    baselines.get(paths[2], ".csv")
+    assert baselines.get(paths[0], ".csv") is not df
+
+
+def test_run_request(df_1_base, df_2_base, tmp_path, capsys):
+    path_1, path_2 = str(tmp_path / "df_1.csv"), str(tmp_path / "df_2.csv")
+    df_1_base.to_csv(path_1, index=False)
+    df_2_base.to_csv(path_2, index=False)
+    request = {"path_1": path_1, "path_2": path_2}
+    response = run_request(request, BaselineCache())
+    assert capsys.readouterr().out == ""
+    assert "They are NOT indentical." in response["summary"]
+    assert "rows" not in response
+    response = run_request(dict(request, rows=True), BaselineCache())
+    assert response["columns"][:2] == ["index", "column"]
+    assert len(response["rows"]) == 3
+
+
+def test_is_loopback():
+    assert is_loopback("127.0.0.1")
+    assert is_loopback("localhost")
+    assert not is_loopback("0.0.0.0")
@@ -0,0 +1,73 @@
+import gzip
+import io
+
+import pytest
+
+from compare_df import foos, streams
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("data.csv", ".csv"),
+        ("data.2020.csv.gz", ".csv"),
+        ("data.csv.zst", ".csv"),
+        ("data.xlsx", ".xlsx"),
+        ("data.gz", ""),
+        ("-", ".csv"),
+    ],
+)
+def test_strip_compression_suffix(path, expected):
+    assert streams.strip_compression_suffix(path) == expected
+
+
+def test_detect_compression():
+    assert streams.detect_compression(gzip.compress(b"a,b")) == "gzip"
+    assert streams.detect_compression(b"a,b\n1,2") is None
+
+
+def test_threaded_reader():
+    data = b"x" * (3 * 1024 + 17)
+    reader = streams.ThreadedReader(io.BytesIO(data), chunk_size=1024)
+    assert reader.read() == data
+    assert reader.read() == b""
+    reader.close()
+
+
+def test_load_compressed_csv(df_1_base, tmp_path):
+    path = tmp_path / "df_1_file.csv.gz"
+    path.write_bytes(gzip.compress(df_1_base.to_csv(index=False).encode()))
+    source = streams.open_csv_source(path)
+    assert isinstance(source, io.BufferedReader)
+    source.close()
+
+    df = foos.load_file(path, foos.indentify_file_format(path, path))
+    assert df.shape == (2, 6)
+    df = foos.load_file(path, ".csv", {"index_col": "str_3"})
+    assert df.shape == (2, 5)
+
+
+def test_load_csv_from_stdin(df_1_base, monkeypatch):
+    data = df_1_base.to_csv(index=False, sep=";").encode()
+    stdin = io.TextIOWrapper(io.BufferedReader(io.BytesIO(data)))
+    monkeypatch.setattr("sys.stdin", stdin)
+    df = foos.load_file("-", ".csv")
+    assert df.shape == (2, 6)
+
+
+def test_load_compressed_csv_sampled_with_index_col(df_1_base, tmp_path):
+    path = tmp_path / "df_1_file.csv.gz"
+    data = df_1_base.to_csv(index=False, sep=";").encode()
+    path.write_bytes(gzip.compress(data))
+    df = foos.load_file(path, ".csv", {"index_col": "str_3"}, sample_rate=1)
+    assert df.shape == (2, 5)
+    assert df.index.name == "str_3"
+
+
+def test_load_uncompressed_csv_with_compression_suffix(df_1_base, tmp_path):
+    path = tmp_path / "df_1_file.csv.gz"
+    df_1_base.to_csv(path, index=False)
+    source = streams.open_csv_source(path)
+    assert isinstance(source, io.BufferedReader)
+    source.close()
+    assert foos.load_file(path, ".csv").shape == (2, 6)
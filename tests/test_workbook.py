@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+from compare_df.workbook import compare_workbooks
+
+
+def test_compare_workbooks(df_1_base, df_2_base, tmp_path, capsys):
+    path_1, path_2 = tmp_path / "wb_1.xlsx", tmp_path / "wb_2.xlsx"
+    with pd.ExcelWriter(path_1) as writer:
+        for sheet_name in ["same", "changed", "dropped"]:
+            df_1_base.to_excel(writer, sheet_name=sheet_name, index=False)
+    with pd.ExcelWriter(path_2) as writer:
+        df_1_base.to_excel(writer, sheet_name="same", index=False)
+        df_2_base.to_excel(writer, sheet_name="changed", index=False)
+
+    df_report, diffs = compare_workbooks(path_1, path_2, interactive=False)
+    captured = capsys.readouterr()
+    assert "=== Sheet 'changed' ===" in captured.out
+    assert df_report["status"].to_dict() == {
+        "same": "identical",
+        "changed": "different",
+        "dropped": "only in DF 1",
+    }
+    assert df_report.loc["changed", "differences"] == 3
+    assert list(diffs) == ["changed"]
+
+
+def test_compare_workbooks_sheet_name(df_1_base, tmp_path):
+    path = tmp_path / "wb.xlsx"
+    df_1_base.to_excel(path, index=False)
+    with pytest.raises(ValueError):
+        compare_workbooks(path, path, {"sheet_name": "Sheet1"})
+
+
+def test_compare_workbooks_invalid_strategy(df_1_base, tmp_path):
+    path = tmp_path / "wb.xlsx"
+    df_1_base.to_excel(path, index=False)
+    with pytest.raises(ValueError):
+        compare_workbooks(path, path, strategy="sampled")